@@ -0,0 +1,129 @@
+# bench_generator.py  (per-stage throughput of the mock generator, with baseline compare)
+import argparse, json, os, platform, resource, sys, tempfile, time
+from datetime import datetime
+
+import fitz  # PyMuPDF
+
+import fill_acord125_fitz as gen
+import metrics
+from template_cache import load_template
+
+# "total" is generate_one() end to end; the rest are its METRICS stage timers,
+# with fill broken down by queue_fill() stage
+STAGES = ["total", "build_mock", "fill", "fill.mapped", "fill.entity", "fill.lob", "fill.loss_history",
+          "flatten", "save"]
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def _summary(samples):
+    st = sorted(samples)
+    return {
+        "mean_ms": round(sum(st) / len(st) * 1000, 3),
+        "p50_ms":  round(gen._percentile(st, .50) * 1000, 3),
+        "p95_ms":  round(gen._percentile(st, .95) * 1000, 3),
+    }
+
+def run_batch(template: str, size: int, seed: int, out_dir: str, records: str, save_profile: str):
+    """
+    Generate `size` documents in-process through generate_one(), the path the
+    CLI runs. Each document is timed end to end; the stage breakdown comes from
+    the per-document METRICS delta it returns.
+    """
+    times = {s: [] for s in STAGES}
+    t_batch = time.perf_counter()
+    for i in range(size):
+        t0 = time.perf_counter()
+        res = gen.generate_one(i, seed, out_dir=out_dir, template=template, records=records,
+                               save_profile=save_profile)
+        times["total"].append(time.perf_counter() - t0)
+        for stage, secs in res["metrics"]["seconds"].items():
+            times.setdefault(stage, []).append(secs)
+    elapsed = time.perf_counter() - t_batch
+    return {
+        "size": size,
+        "seconds": round(elapsed, 3),
+        "docs_per_sec": round(size / elapsed, 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "stages": {s: _summary(v) for s, v in times.items() if v},
+    }
+
+def compare(current: dict, baseline: dict, threshold: float):
+    """
+    Regressions of current vs baseline, matched by batch size.
+    A stage regresses when its p50 grows by more than `threshold` (0.2 = +20%);
+    throughput regresses when docs/sec drops by more than `threshold`.
+    """
+    failures = []
+    base = {b["size"]: b for b in baseline.get("batches", [])}
+    for cur in current["batches"]:
+        ref = base.get(cur["size"])
+        if not ref:
+            continue
+        if cur["docs_per_sec"] < ref["docs_per_sec"] * (1 - threshold):
+            failures.append(f"size {cur['size']}: docs/sec {cur['docs_per_sec']} < baseline {ref['docs_per_sec']}")
+        for stage, stats in cur["stages"].items():
+            ref_stats = ref["stages"].get(stage)
+            if ref_stats and stats["p50_ms"] > ref_stats["p50_ms"] * (1 + threshold):
+                failures.append(f"size {cur['size']}: {stage} p50 {stats['p50_ms']} ms > baseline {ref_stats['p50_ms']} ms")
+    return failures
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the mock ACORD generator stage by stage.")
+    ap.add_argument("--sizes", default="1,10,50", help="comma-separated batch sizes")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--template", default=gen.TEMPLATE)
+    ap.add_argument("--records", choices=("faker", "batch"), default="faker")
+    ap.add_argument("--save-profile", choices=sorted(gen.SAVE_PROFILES), default=gen.SAVE_DEFAULT)
+    ap.add_argument("--out", default=os.path.join(gen.OUT_DIR, "bench.json"))
+    ap.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed regression ratio (default 0.25)")
+    ap.add_argument("--save-baseline", action="store_true", help="write results to --baseline instead of comparing")
+    args = ap.parse_args(argv)
+    if args.save_baseline and not args.baseline:
+        ap.error("--save-baseline needs --baseline PATH to write to")
+
+    gen.AS_OF = gen.today()
+    metrics.enable()
+    tpl = load_template(args.template)
+    result = {
+        "generated": datetime.now().isoformat(),
+        "template": os.path.basename(tpl.path),
+        "template_sha256": tpl.digest,
+        "records": args.records,
+        "save_profile": args.save_profile,
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "batches": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            b = run_batch(args.template, size, args.seed, tmp, args.records, args.save_profile)
+            result["batches"].append(b)
+            print(f"size {size:>5}: {b['docs_per_sec']:.2f} docs/s, peak RSS {b['peak_rss_mb']} MB")
+            for stage, s in b["stages"].items():
+                print(f"    {stage:<18} p50 {s['p50_ms']:>9.2f} ms   p95 {s['p95_ms']:>9.2f} ms")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Wrote: {args.out}")
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote baseline: {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = compare(result, json.load(f), args.threshold)
+        for msg in failures:
+            print(f"REGRESSION {msg}")
+        if failures:
+            return 1
+        print(f"No regressions vs {args.baseline} (threshold {args.threshold:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
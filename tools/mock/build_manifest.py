@@ -0,0 +1,236 @@
+# build_manifest.py  (incremental corpus builds: what each output was built from, so unchanged ones are skipped)
+import hashlib, json, os, re, sqlite3
+from datetime import datetime
+
+import faker
+import fitz  # PyMuPDF
+
+BUILD_DB = ".build.sqlite"
+# Modules whose code decides what a document looks like. Editing any of them changes
+# generator_version() and so invalidates every output.
+GENERATOR_SOURCES = ("fill_acord125_fitz.py", "mock_records.py", "ground_truth.py",
+                     "template_cache.py", "fill_plans.py", "scan_render.py")
+COMMIT_EVERY = 64
+INDEX_RE = re.compile(rb'"index":(\d+)')   # first one on a manifest line is the document's
+SCHEMA_VERSION = 2   # bump when the outputs table changes; older build DBs are discarded (full rebuild)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    idx               INTEGER PRIMARY KEY,
+    build_key         TEXT NOT NULL,
+    template_sha256   TEXT NOT NULL,
+    generator_version TEXT NOT NULL,
+    seed              INTEGER NOT NULL,
+    save_profile      TEXT NOT NULL,
+    options           TEXT NOT NULL,
+    files             TEXT NOT NULL,
+    file_stats        TEXT NOT NULL,
+    record_offset     INTEGER NOT NULL,
+    record_length     INTEGER NOT NULL,
+    record_sha256     TEXT NOT NULL,
+    built             TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def generator_version() -> str:
+    """Hash of the generator sources plus the Faker/PyMuPDF versions that shape the output."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256(f"faker={faker.VERSION};pymupdf={fitz.VersionBind}".encode())
+    for name in GENERATOR_SOURCES:
+        path = os.path.join(here, name)
+        if os.path.exists(path):
+            h.update(name.encode() + b"\0" + bytes.fromhex(_sha256_file(path)))
+    return h.hexdigest()[:16]
+
+def build_inputs(template_sha256: str, seed: int, save_profile: str, **options) -> dict:
+    """Everything besides the index that an output depends on; options with value None are dropped."""
+    return {
+        "template_sha256": template_sha256,
+        "generator_version": generator_version(),
+        "seed": seed,
+        "save_profile": save_profile,
+        "options": {k: v for k, v in sorted(options.items()) if v is not None},
+    }
+
+def build_key(inputs: dict, index: int) -> str:
+    blob = json.dumps({**inputs, "index": index}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+def _stat(path: str):
+    """[size, mtime_ns] of a file, or None if it is gone."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+class BuildManifest:
+    """
+    SQLite record of every output in an out/ directory: its build key, the
+    files it produced (with size and mtime) and where its ground-truth line
+    sits in the manifest (with a hash of the line). Rows are committed in
+    small batches, so an interrupted run resumes from where it stopped.
+    """
+    def __init__(self, out_dir: str, manifest_path: str):
+        self.out_dir = out_dir
+        self.manifest_path = manifest_path
+        os.makedirs(out_dir, exist_ok=True)
+        self.con = sqlite3.connect(os.path.join(out_dir, BUILD_DB))
+        if self.con.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.con.executescript("DROP TABLE IF EXISTS outputs; DROP TABLE IF EXISTS meta;")
+            self.con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.con.executescript(SCHEMA)
+        self._pending = 0
+        self._pruned = set()
+
+    def _rows(self):
+        return {r[0]: r[1:] for r in self.con.execute(
+            "SELECT idx, build_key, files, file_stats, record_offset, record_length, record_sha256 FROM outputs")}
+
+    def _manifest_untouched(self) -> bool:
+        """The manifest is exactly as our last compact() left it, so stored offsets can be trusted."""
+        row = self.con.execute("SELECT value FROM meta WHERE key = 'manifest_stat'").fetchone()
+        return row is not None and json.loads(row[0]) == _stat(self.manifest_path)
+
+    def _record_ok(self, fh, offset: int, length: int, pdf: str, digest: str | None = None) -> bool:
+        """
+        The manifest line at offset is still this document's (compaction or a crash can move it).
+        With digest, the whole line is hashed, which also catches a line rewritten in place.
+        """
+        if fh is None:
+            return False
+        fh.seek(offset)
+        if digest:
+            return hashlib.sha256(fh.read(length)).hexdigest() == digest
+        head = fh.read(min(length, 64 + len(pdf) * 2))
+        return head.startswith(b'{"file":' + json.dumps(pdf).encode())
+
+    def plan(self, indexes, inputs: dict):
+        """
+        Split indexes into (todo, up_to_date). todo has no output, a stale key,
+        or files whose size/mtime changed since they were built (e.g. a
+        non-incremental run overwrote them). Ground-truth lines are hashed in
+        full only when the manifest changed since the last compact().
+        """
+        rows = self._rows()
+        todo, fresh = [], []
+        verify = not self._manifest_untouched()
+        fh = open(self.manifest_path, "rb") if os.path.exists(self.manifest_path) else None
+        try:
+            for i in indexes:
+                row = rows.get(i)
+                ok = row is not None and row[0] == build_key(inputs, i)
+                if ok:
+                    files = json.loads(row[1])
+                    ok = ([_stat(p) for p in files] == json.loads(row[2])
+                          and self._record_ok(fh, row[3], row[4], files[0], row[5] if verify else None))
+                (fresh if ok else todo).append(i)
+        finally:
+            if fh:
+                fh.close()
+        return todo, fresh
+
+    def record(self, index: int, inputs: dict, files: list, offset: int, length: int):
+        """
+        Store a freshly built output (call after its files and manifest line are
+        written and flushed); files it produced last time but not now are deleted.
+        """
+        with open(self.manifest_path, "rb") as fh:
+            fh.seek(offset)
+            line = fh.read(length)
+        old = self.con.execute("SELECT files FROM outputs WHERE idx = ?", (index,)).fetchone()
+        if old:
+            for p in set(json.loads(old[0])) - set(files):
+                _remove(p)
+        self.con.execute(
+            "INSERT OR REPLACE INTO outputs VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            (index, build_key(inputs, index), inputs["template_sha256"], inputs["generator_version"],
+             inputs["seed"], inputs["save_profile"], json.dumps(inputs["options"], sort_keys=True, default=str),
+             json.dumps(files), json.dumps([_stat(p) for p in files]), offset, length,
+             hashlib.sha256(line).hexdigest(), datetime.now().isoformat()))
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self.con.commit()
+        self._pending = 0
+
+    def prune(self, keep) -> list:
+        """Delete outputs (files and rows) whose index is not in `keep`. Returns the removed indexes."""
+        keep = set(keep)
+        gone = [(i, json.loads(f)) for i, f in self.con.execute("SELECT idx, files FROM outputs") if i not in keep]
+        for i, files in gone:
+            for p in files:
+                _remove(p)
+        with self.con:
+            self.con.executemany("DELETE FROM outputs WHERE idx = ?", [(i,) for i, _ in gone])
+        self._pruned.update(i for i, _ in gone)
+        return [i for i, _ in gone]
+
+    def compact(self):
+        """
+        Rewrite the ground-truth manifest with one line per document, in index
+        order, dropping lines of rebuilt or pruned documents. Documents this
+        database does not track (e.g. shards built without --incremental) keep
+        their last line. Written to a temp file and renamed; offsets are
+        updated afterwards (if that is lost, plan() notices the mismatch and
+        rebuilds the affected documents).
+        """
+        self.commit()
+        rows = self._rows()
+        if not os.path.exists(self.manifest_path):
+            return
+        untracked, offset = {}, 0
+        with open(self.manifest_path, "rb") as src:
+            for raw in src:
+                m = INDEX_RE.search(raw, 0, 4096)
+                if m and raw.endswith(b"\n"):
+                    i = int(m.group(1))
+                    if i not in rows and i not in self._pruned:
+                        untracked[i] = (offset, len(raw))
+                offset += len(raw)
+        tmp = self.manifest_path + ".tmp"
+        moved, lost = [], []
+        with open(self.manifest_path, "rb") as src, open(tmp, "wb") as dst:
+            for i in sorted(rows.keys() | untracked.keys()):
+                if i in untracked:
+                    src.seek(untracked[i][0])
+                    dst.write(src.read(untracked[i][1]))
+                    continue
+                _, files, _, offset, length, digest = rows[i]
+                src.seek(offset)
+                line = src.read(length)
+                if hashlib.sha256(line).hexdigest() != digest:
+                    lost.append((i,))
+                    continue
+                moved.append((dst.tell(), len(line), i))
+                dst.write(line)
+        os.replace(tmp, self.manifest_path)
+        with self.con:
+            self.con.executemany("UPDATE outputs SET record_offset = ?, record_length = ? WHERE idx = ?", moved)
+            # no ground truth for these any more; the next incremental run rebuilds them
+            self.con.executemany("DELETE FROM outputs WHERE idx = ?", lost)
+            self.con.execute("INSERT OR REPLACE INTO meta VALUES ('manifest_stat', ?)",
+                             (json.dumps(_stat(self.manifest_path)),))
+
+    def close(self):
+        self.commit()
+        self.con.close()
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,80 @@
+# field_writes.py  (resolve field names through a template's field index and write widgets by xref)
+#
+# Shared by the generator's fill_fields() and fill_plans.Plan.run(); kept out of
+# fill_acord125_fitz.py so fill_plans never imports the generator (see formatting.py).
+from metrics import METRICS
+
+# Numeric widget type codes (same legend as inspector)
+WTYPE_CHECKBOX = 2
+WTYPE_TEXT     = 7
+
+def set_checkbox(widget, on: bool):
+    try:
+        widget.field_value = "Yes" if on else "Off"
+        widget.update()
+        METRICS.inc("fields_written")
+        return True
+    except RuntimeError:
+        # Orphan / unbound anno – ignore
+        METRICS.inc("orphan_errors")
+    except Exception:
+        METRICS.inc("write_errors")
+    return False
+
+def set_text(widget, value: str):
+    try:
+        widget.field_value = "" if value is None else str(value)
+        widget.update()
+        METRICS.inc("fields_written")
+        return True
+    except RuntimeError:
+        # Orphan / unbound anno – ignore
+        METRICS.inc("orphan_errors")
+    except Exception:
+        METRICS.inc("write_errors")
+    return False
+
+def resolve(assignments: list, index: dict):
+    """
+    assignments: [(field_name, value, force_checkbox), ...]  (later entries win)
+    Returns (by_page, missing) with by_page = { page_no -> { xref -> (field_name, field_type, value, force_checkbox) } }.
+    """
+    by_page = {}
+    missing = []
+    for fname, value, force_checkbox in assignments:
+        fname = (fname or "").strip()
+        if not fname:
+            continue
+        targets = index.get(fname)
+        if not targets:
+            missing.append(fname)
+            continue
+        for pno, xref, ftype in targets:
+            by_page.setdefault(pno, {})[xref] = (fname, ftype, value, force_checkbox)
+    return by_page, missing
+
+def write_pages(doc, by_page: dict, written: dict | None = None):
+    """
+    Write resolved targets (see resolve), page by page, loading each widget once by xref.
+    written: optional dict, filled with { xref -> (field_name, page_no, field_type, is_checkbox, value) }
+             where value is the bool (checkbox path) or str (text path) actually set.
+    Returns the number of widgets updated without error.
+    """
+    updated = 0
+    for pno in sorted(by_page):
+        page = doc[pno]
+        for xref, (fname, ftype, value, force_checkbox) in by_page[pno].items():
+            w = page.load_widget(xref)
+            METRICS.inc("widgets_visited")
+            if w is None:
+                continue
+            is_checkbox = (force_checkbox is True) or (force_checkbox is None and ftype == WTYPE_CHECKBOX)
+            if is_checkbox:
+                value = str(value).strip().upper() in ("Y","YES","TRUE","ON","1")
+                updated += set_checkbox(w, value)
+            else:
+                value = "" if value is None else str(value)
+                updated += set_text(w, value)
+            if written is not None:
+                written[xref] = (fname, pno, ftype, is_checkbox, value)
+    return updated
@@ -1,49 +1,37 @@
 # fill_acords_exact.py  (updated to avoid constants)
-import fitz  # PyMuPDF
 from faker import Faker
 from datetime import date, timedelta
-import os, random, re
+from concurrent.futures import ProcessPoolExecutor
+import argparse, hashlib, itertools, os, random, time
+
+from formatting import INDUSTRIES, money, fmt_phone, plus_year, mk_company_domain
+from field_writes import WTYPE_CHECKBOX, WTYPE_TEXT, resolve, write_pages
+from template_cache import load_template, scan_widgets, field_index
+from ground_truth import build_record, write_di_labels, ManifestWriter
+from metrics import METRICS, Metrics
+from parallel import bounded_map
+import metrics
 
 TEMPLATE = "Acord-125-Commercial-Insurance-Application.pdf"
 OUT_DIR  = "out"
-os.makedirs(OUT_DIR, exist_ok=True)
 
 fake = Faker("en_US")
 
-# Numeric widget type codes (same legend as inspector)
-WTYPE_CHECKBOX = 2
-WTYPE_TEXT     = 7
-
-def money(lo, hi):
-    return f"${random.randrange(lo, hi):,}"
-
-def fmt_phone():
-    return f"({random.randint(201,989)}) {random.randint(200,999)}-{random.randint(1000,9999)}"
+# Pinned "today" for reproducible batches (None = real date)
+AS_OF: date | None = None
 
 def today():
-    return date.today()
+    return AS_OF or date.today()
 
-def plus_year(d):
-    try:
-        return d.replace(year=d.year + 1)
-    except ValueError:
-        return d + (date(d.year + 1, 3, 1) - date(d.year, 3, 1))
-
-def mk_company_domain(name:str) -> str:
-    return "https://" + re.sub(r"[^a-z0-9]+", "", name.lower()) + ".com"
-
-INDUSTRIES = [
-    ("Construction Contractor", "236115"),
-    ("Restaurant", "722511"),
-    ("Retail Clothing Store", "448140"),
-    ("Medical Office", "621111"),
-    ("IT Consulting Firm", "541512"),
-    ("Real Estate Agency", "531210"),
-    ("Trucking & Logistics", "484110"),
-    ("Manufacturing", "333120"),
-    ("Landscaping Services", "561730"),
-    ("Non-Profit Organization", "813110"),
-]
+def doc_seed(base_seed: int, index: int) -> int:
+    """Per-document seed derived from (base seed, index) only, so any shard can be regenerated alone."""
+    digest = hashlib.sha256(f"{base_seed}:{index}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def seed_document(base_seed: int, index: int):
+    s = doc_seed(base_seed, index)
+    random.seed(s)
+    fake.seed_instance(s)
 
 ENTITY_TO_FIELD = {
     "Corporation": "F[0].P1[0].NamedInsured_LegalEntity_CorporationIndicator_A[0]",
@@ -209,83 +197,77 @@ def build_mock(i:int):
     }
     return data, ent, losses
 
-def _set_checkbox(widget, on: bool):
-    try:
-        widget.field_value = "Yes" if on else "Off"
-        widget.update()
-    except RuntimeError:
-        # Orphan / unbound anno – ignore
-        pass
-    except Exception:
-        pass
-
-def _set_text(widget, value: str):
-    try:
-        widget.field_value = "" if value is None else str(value)
-        widget.update()
-    except RuntimeError:
-        # Orphan / unbound anno – ignore
-        pass
-    except Exception:
-        pass
-
-def _apply_to_field(doc, field_name: str, value, force_checkbox: bool | None = None):
+def build_field_index(doc):
+    """
+    Walk every page once and map each field name to its widgets.
+    Returns { field_name -> [(page_no, xref, field_type), ...] }.
     """
-    Find *fresh* widget instances by name and set value (text or checkbox).
-    Returns True if at least one widget was updated.
+    return field_index(scan_widgets(doc))
+
+def _apply_to_field(doc, field_name: str, value, force_checkbox: bool | None = None, index: dict | None = None):
+    """
+    Set a single field by name (text or checkbox).
+    Returns True if at least one widget was updated; a name that is not in
+    the index or whose widgets can't be loaded or written counts as not found.
     """
     if not field_name:
         return False
-    updated = False
-    fname = field_name.strip()
-
-    for pno in range(len(doc)):
-        page = doc[pno]
-        widgets = page.widgets() or []
-        for w in widgets:
-            if (w.field_name or "").strip() != fname:
-                continue
-
-            is_checkbox = (force_checkbox is True) or (force_checkbox is None and w.field_type == WTYPE_CHECKBOX)
-            if is_checkbox:
-                truthy = str(value).strip().upper() in ("Y","YES","TRUE","ON","1")
-                _set_checkbox(w, truthy)
-            else:
-                _set_text(w, value)
-            updated = True
-    return updated
-
-def _apply_many(doc, mapping: dict, checkbox_names: set[str] | None = None):
+    if index is None:
+        index = build_field_index(doc)
+    by_page, _ = resolve([(field_name, value, force_checkbox)], index)
+    if write_pages(doc, by_page):
+        return True
+    METRICS.inc("fields_not_found")
+    return False
+
+def _apply_assignments(doc, assignments: list, index: dict | None = None, written: dict | None = None):
+    """
+    Resolve names through the field index, then write them grouped by page.
+    Returns the list of field names that were not found in the document.
+    """
+    if index is None:
+        index = build_field_index(doc)
+    by_page, missing = resolve(assignments, index)
+    write_pages(doc, by_page, written)
+    METRICS.inc("fields_not_found", len(missing))
+    return missing
+
+def _apply_many(doc, mapping: dict, checkbox_names: set[str] | None = None, index: dict | None = None):
     """
     mapping: { field_name -> value }
     checkbox_names: optional set of field_names that must be treated as checkboxes.
+    Returns the list of field names that were not found in the document.
     """
     checkbox_names = checkbox_names or set()
-    for fname, val in mapping.items():
-        force_cb = (fname in checkbox_names)
-        _apply_to_field(doc, fname, val, force_checkbox=force_cb)
+    assignments = [(fname, val, fname in checkbox_names) for fname, val in mapping.items()]
+    return _apply_assignments(doc, assignments, index=index)
 
-def fill_fields(doc, data_map: dict, entity_key: str, losses: list):
+def queue_fill(data_map: dict, entity_key: str, losses: list):
+    """
+    Steps 1-4 of a fill as assignment lists, one per stage, in write order:
+    { "mapped" | "entity" | "lob" | "loss_history" -> [(field_name, value, force_checkbox), ...] }
+    """
     # 1) Basic mapped values (text + checkboxes in data_map)
     #    We'll treat *only* known checkbox names as forced checkboxes if you want,
     #    but for most ACORDs the widget type is accurate, so force not required.
-    _apply_many(doc, data_map)
+    mapped = [(f, v, None) for f, v in data_map.items()]
 
     # 2) Entity checkboxes: set selected one True, all others False
-    for ent, f in ENTITY_TO_FIELD.items():
-        _apply_to_field(doc, f, ent == entity_key, force_checkbox=True)
+    entity = [(f, ent == entity_key, True) for ent, f in ENTITY_TO_FIELD.items()]
 
     # 3) Lines of business: pick several and set premiums
+    lines = []
     for check_name, prem_name, (lo, hi) in LOB_CHECK_PREMIUM:
         on = random.random() < 0.75
-        _apply_to_field(doc, check_name, on, force_checkbox=True)
-        _apply_to_field(doc, prem_name, (f"${random.randrange(lo, hi):,}" if on else ""))
+        lines.append((check_name, on, True))
+        lines.append((prem_name, (f"${random.randrange(lo, hi):,}" if on else ""), None))
 
     # 4) Loss history (Page 4)
+    loss_history = []
     total_paid = 0
 
     def set_by_name(fname, val, checkbox=False):
-        _apply_to_field(doc, fname, val, force_checkbox=checkbox)
+        loss_history.append((fname, val, checkbox))
 
     rows = [
         ("A", "F[0].P4[0].LossHistory_OccurrenceDate_A[0]",
@@ -335,27 +317,371 @@ def fill_fields(doc, data_map: dict, entity_key: str, losses: list):
         if total_paid:
             set_by_name("F[0].P4[0].LossHistory_TotalAmount_A[0]", f"${total_paid:,}")
 
-    # 5) Final flatten (fresh widgets per page to avoid orphaned refs)
-    for pno in range(len(doc)):
-        page = doc[pno]
-        for w in (page.widgets() or []):
-            try:
-                w.update()
-                w.flatten()
-            except RuntimeError:
-                # orphan widget: ignore
-                pass
-            except Exception:
-                pass
+    return {"mapped": mapped, "entity": entity, "lob": lines, "loss_history": loss_history}
+
+def fill_fields(doc, data_map: dict, entity_key: str, losses: list, index: dict | None = None,
+                written: dict | None = None):
+    """
+    Fill one document. Each queued stage is written as one batch through the
+    field index and timed as "fill.<stage>". Flattening is a separate stage
+    (flatten_document) so callers can skip or time it.
+    written: optional dict receiving every widget write (see _apply_assignments).
+    Returns the list of field names that were not found in the document.
+    """
+    if index is None:
+        index = build_field_index(doc)
+    missing = []
+    for stage, assignments in queue_fill(data_map, entity_key, losses).items():
+        with METRICS.timer(f"fill.{stage}"):
+            missing += _apply_assignments(doc, assignments, index=index, written=written)
+    return missing
+
+def flatten_document(doc):
+    """
+    Step 5: bake every widget's appearance into page content and drop the
+    form fields, in one document-level pass. Widgets are not updated again:
+    the writes already regenerated the ones they touched. PyMuPDF only bakes
+    whole documents, and every page has to be baked anyway (a page without
+    writes still has blank fields to turn into content).
+    Returns the number of widgets still present afterwards (not flattened).
+    """
+    doc.bake(annots=False, widgets=True)
+    left = 0
+    for page in doc:
+        w = page.first_widget
+        while w:
+            left += 1
+            w = w.next
+    return left
+
+def make_record(index: int, base_seed: int, records: str = "faker"):
+    """
+    (data_map, entity_key, losses) for one document.
+    records="faker" calls build_mock(); "batch" reads the NumPy columnar
+    generator in mock_records.py (same keys, values drawn from seeded pools).
+    """
+    if records == "batch":
+        from mock_records import record_for
+        # mock_records has no clock of its own; the effective date is the pinned one
+        return record_for(base_seed, index, today())
+    return build_mock(index)
+
+# Named doc.save() settings. Every profile keeps the template ID (no_new_id)
+# so output stays byte-identical for a given seed.
+SAVE_PROFILES = {
+    # previous default: full dedup + deflate + content-stream clean (slowest)
+    "standard": {"garbage": 4, "deflate": True, "clean": True},
+    # throughput: drop unused objects only, no compression, no clean
+    "fast":     {"garbage": 1},
+    # storage: full dedup so identical font/resource streams are shared, everything deflated,
+    # objects packed into object streams
+    "compact":  {"garbage": 4, "deflate": True, "deflate_images": True, "deflate_fonts": True, "use_objstms": 1},
+    # load tests: PDF kept in memory (doc.tobytes), nothing written. tobytes goes through a
+    # Python stream, so object streams are used to cut the number of small writes
+    "bytes":    {"garbage": 1, "deflate": True, "use_objstms": 1},
+}
+SAVE_DEFAULT = "standard"
 
-def main():
-    for i in range(10):
-        data_map, entity_key, losses = build_mock(i)
-        out_pdf = os.path.join(OUT_DIR, f"ACORD_125_Sample_{i+1}.pdf")
-        with fitz.open(TEMPLATE) as doc:
-            fill_fields(doc, data_map, entity_key, losses)
-            doc.save(out_pdf, deflate=True, incremental=False, garbage=4, clean=True)
-        print(f"Wrote: {out_pdf}")
+def save_document(doc, out_pdf: str, profile: str = SAVE_DEFAULT):
+    """
+    Save with a named profile. Returns (size_bytes, seconds, data) where data
+    is the PDF bytes for the "bytes" profile and None otherwise.
+    """
+    opts = SAVE_PROFILES[profile]
+    t0 = time.perf_counter()
+    if profile == "bytes":
+        data = doc.tobytes(no_new_id=True, **opts)
+        return len(data), time.perf_counter() - t0, data
+    doc.save(out_pdf, incremental=False, no_new_id=True, **opts)
+    return os.path.getsize(out_pdf), time.perf_counter() - t0, None
+
+def generate_one(index: int, base_seed: int, out_dir: str = OUT_DIR, template: str = TEMPLATE,
+                 di_labels: bool = False, records: str = "faker", save_profile: str = SAVE_DEFAULT,
+                 flatten: bool = True, catalog: str | None = None, plan: str | None = None,
+                 scan: str | None = None, scan_format: str = "pdf"):
+    """
+    build_mock + fill_fields + flatten + save for one document.
+    plan: optional spec path (fill_plans.py); its compiled plan replaces fill_fields
+          (and build_mock too, unless the spec reads the record).
+    scan: optional scan_render profile; also writes a rasterized copy (record["scan"])
+          and gives each field a "scan_bbox" in that copy's coordinates.
+    Returns { file, missing, unflattened, record, mock, bytes, save_seconds, data, metrics }
+    where mock is the source record {data, entity, losses} (with a plan: the
+    values it wrote) and metrics is this document's instrumentation delta
+    (None when disabled).
+    """
+    seed_document(base_seed, index)
+    tpl = load_template(template, catalog)
+    fill_plan = None
+    if plan:
+        from fill_plans import load_plan
+        fill_plan = load_plan(plan, tpl)
+    data_map, entity_key, losses = {}, None, []
+    if fill_plan is None or fill_plan.needs_record:
+        with METRICS.timer("build_mock"):
+            data_map, entity_key, losses = make_record(index, base_seed, records)
+    out_pdf = os.path.join(out_dir, f"ACORD_125_Sample_{index+1}.pdf")
+    written = {}
+    with tpl.open() as doc:
+        with METRICS.timer("fill"):
+            if fill_plan:
+                # the plan's generators get this module's seeded Faker and pinned date
+                biz, naics = INDUSTRIES[index % len(INDUSTRIES)]
+                ctx = {"index": index, "fake": fake, "today": today(), "business": biz, "naics": naics,
+                       "record": data_map, "entity": entity_key, "losses": losses}
+                missing = fill_plan.run(doc, ctx, written)
+                data_map, entity_key, losses = ctx["values"], ctx.get("entity"), ctx.get("losses") or []
+            else:
+                missing = fill_fields(doc, data_map, entity_key, losses, index=tpl.index, written=written)
+        with METRICS.timer("flatten"):
+            unflattened = flatten_document(doc) if flatten else 0
+        with METRICS.timer("save"):
+            size, save_s, data = save_document(doc, out_pdf, save_profile)
+        if scan:
+            from scan_render import render_scan, scan_boxes
+            with METRICS.timer("scan"):
+                scan_file, scan_size, scan_transforms = render_scan(doc, out_pdf, scan, scan_format,
+                                                                    doc_seed(base_seed, index))
+            METRICS.inc("scan_bytes_written", scan_size)
+    record = build_record(tpl, written, out_pdf, index, base_seed, missing)
+    if scan:
+        record["scan"] = scan_file
+        scan_boxes(record, scan_transforms)
+    if di_labels:
+        write_di_labels(record, tpl)
+    METRICS.inc("documents")
+    METRICS.inc("unflattened", unflattened)
+    METRICS.inc("bytes_written", size)
+    return {"file": out_pdf, "missing": missing, "unflattened": unflattened, "record": record,
+            "mock": {"data": data_map, "entity": entity_key, "losses": losses}, "bytes": size, "save_seconds": save_s, "data": data, "metrics": METRICS.drain()}
+
+def _init_worker(as_of, instrument=False):
+    global AS_OF
+    AS_OF = as_of
+    metrics.enable(instrument)
+
+def _generate_job(job):
+    index, base_seed, opts = job
+    return generate_one(index, base_seed, **opts)
+
+def generate_batch(start: int, count: int, base_seed: int, workers: int = 1, chunk_size: int = 8,
+                   indexes=None, longrun=None, **opts):
+    """
+    Yield generate_one() results for indexes [start, start+count) in index order,
+    or for the given `indexes` (incremental builds pass only the stale ones).
+    opts are passed through to generate_one (out_dir, template, records, ...).
+    longrun: optional long_run.LongRun; documents then run on recycled worker
+    processes with memory limits, and each result carries a "memory" sample.
+    Output depends only on (base_seed, index), never on workers/chunk_size.
+    """
+    os.makedirs(opts.get("out_dir", OUT_DIR), exist_ok=True)
+    if indexes is None:
+        indexes = range(start, start + count)
+    if longrun is not None:
+        jobs = ((i, base_seed, opts) for i in indexes)
+        yield from longrun.map(_generate_job, jobs, max(1, workers), _init_worker, (AS_OF, METRICS.enabled))
+        return
+    jobs = [(i, base_seed, opts) for i in indexes]
+    if workers <= 1:
+        _init_worker(AS_OF, METRICS.enabled)
+        yield from map(_generate_job, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(AS_OF, METRICS.enabled)) as ex:
+        yield from ex.map(_generate_job, jobs, chunksize=max(1, chunk_size))
+
+def iter_documents(template: str = TEMPLATE, count: int | None = None, seed: int = 0, start: int = 0,
+                   workers: int = 1, as_of: date | None = None, **opts):
+    """
+    Lazily yield (record, ground_truth, pdf_bytes) for documents start, start+1, ...
+    (forever when count is None). Nothing touches the filesystem: PDFs come from
+    doc.tobytes() and ground_truth["file"] is only the name the PDF would have.
+
+      record        source values {data, entity, losses} the form was filled from
+      ground_truth  the manifest record (fields with page, bbox, value)
+      pdf_bytes     the flattened PDF
+
+    Documents are produced on demand, so memory stays flat however many are
+    pulled. With workers > 1 at most 2*workers documents are generated ahead.
+    opts go to generate_one (records, plan, flatten, catalog).
+
+        for record, truth, pdf in iter_documents(count=100, seed=7):
+            sock.sendall(pdf)
+    """
+    if "save_profile" in opts or "scan" in opts or "di_labels" in opts:
+        raise ValueError("iter_documents always returns bytes; save_profile/scan/di_labels write files")
+    as_of = as_of or AS_OF
+    opts = {**opts, "template": template, "save_profile": "bytes"}
+    indexes = itertools.count(start) if count is None else range(start, start + count)
+    jobs = ((i, seed, opts) for i in indexes)
+    if workers <= 1:
+        results = _generate_as_of(jobs, as_of)
+    else:
+        ex = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(as_of, METRICS.enabled))
+        results = bounded_map(ex, _generate_job, jobs, max_inflight=2 * workers)
+    try:
+        for res in results:
+            yield res["mock"], res["record"], res["data"]
+    finally:
+        if workers > 1:
+            ex.shutdown(cancel_futures=True)
+
+def _generate_as_of(jobs, as_of):
+    """In-process _generate_job with AS_OF pinned only for the duration of each call."""
+    global AS_OF
+    for job in jobs:
+        saved, AS_OF = AS_OF, as_of
+        try:
+            res = _generate_job(job)
+        finally:
+            AS_OF = saved
+        yield res
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+def print_save_summary(profile: str, save_times: list, sizes: list):
+    if not sizes:
+        return
+    st = sorted(save_times)
+    total = sum(sizes)
+    print(f"Save profile '{profile}': {len(sizes)} docs, {total/1e6:.1f} MB total, "
+          f"{total/len(sizes)/1024:.0f} KiB/doc avg (min {min(sizes)/1024:.0f}, max {max(sizes)/1024:.0f})")
+    print(f"  save time/doc: mean {sum(st)/len(st)*1000:.1f} ms, "
+          f"p50 {_percentile(st, .50)*1000:.1f} ms, p95 {_percentile(st, .95)*1000:.1f} ms")
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Generate mock ACORD 125 PDFs.")
+    ap.add_argument("--count", type=int, default=10, help="number of documents (default 10)")
+    ap.add_argument("--start", type=int, default=0, help="first document index, for regenerating a shard")
+    ap.add_argument("--seed", type=int, default=0, help="base seed; document i uses hash(seed, i)")
+    ap.add_argument("--workers", type=int, default=1, help="worker processes (default 1 = in-process)")
+    ap.add_argument("--chunk-size", type=int, default=8, help="documents handed to a worker at a time")
+    ap.add_argument("--as-of", type=date.fromisoformat, default=None, help="pin today's date (YYYY-MM-DD)")
+    ap.add_argument("--template", default=TEMPLATE)
+    ap.add_argument("--out", default=OUT_DIR)
+    ap.add_argument("--manifest", default=None,
+                    help="ground-truth JSONL, appended to (default <out>/ground_truth.jsonl)")
+    ap.add_argument("--records", choices=("faker", "batch"), default="faker",
+                    help="record source: per-document Faker calls or the NumPy batch generator")
+    ap.add_argument("--save-profile", choices=sorted(SAVE_PROFILES), default=SAVE_DEFAULT,
+                    help="fast = throughput, compact = smallest files, bytes = serialize in memory only")
+    ap.add_argument("--no-flatten", dest="flatten", action="store_false", help="keep the form fields editable")
+    ap.add_argument("--catalog", default=None, help="inspect_fields SQLite catalog to read widget metadata from")
+    ap.add_argument("--plan", default=None, metavar="SPEC",
+                    help="fill from a compiled form spec (e.g. specs/acord125.json) instead of fill_fields")
+    ap.add_argument("--scan", default=None, metavar="PROFILE",
+                    help="also render a scanned copy: clean, office, fax or color (see scan_render.py)")
+    ap.add_argument("--scan-format", choices=("pdf", "tiff"), default="pdf",
+                    help="scan container: image-only PDF or multi-page TIFF (needs Pillow)")
+    ap.add_argument("--metrics", default=None, metavar="PREFIX",
+                    help="enable instrumentation; write PREFIX.json and PREFIX.prom (Prometheus textfile)")
+    ap.add_argument("--di-labels", action="store_true", help="also write <pdf>.labels.json for Document Intelligence")
+    ap.add_argument("--recycle-after", type=int, default=None, metavar="N",
+                    help="long-run mode: replace each worker process after N documents")
+    ap.add_argument("--soft-limit-mb", type=float, default=None,
+                    help="long-run mode: shrink the MuPDF store when a worker's RSS exceeds this "
+                         "(default: the hard limit)")
+    ap.add_argument("--hard-limit-mb", type=float, default=None,
+                    help="long-run mode: replace a worker whose RSS stays above this after shrinking")
+    ap.add_argument("--memory-profile", default=None, metavar="CSV",
+                    help="long-run mode: write per-document worker RSS samples here")
+    ap.add_argument("--incremental", action="store_true",
+                    help="only build missing/stale documents (tracked in <out>/.build.sqlite); resumes interrupted runs")
+    ap.add_argument("--prune", action="store_true",
+                    help="with --incremental, delete tracked outputs outside [start, start+count); "
+                         "don't use when shards share an out dir")
+    return ap.parse_args(argv)
+
+def output_files(res: dict) -> list:
+    """Files generate_one() wrote for one document; the PDF comes first."""
+    files = [res["file"]]
+    if "scan" in res["record"]:
+        files.append(res["record"]["scan"])
+    if os.path.exists(res["file"] + ".labels.json"):
+        files.append(res["file"] + ".labels.json")
+    return files
+
+def plan_incremental(args, manifest: str):
+    """
+    Open the build manifest for args.out and decide what to rebuild.
+    Returns (build, inputs, stale_indexes); with --prune, outputs outside the
+    requested range are deleted, otherwise they are left alone (other shards).
+    """
+    from build_manifest import BuildManifest, build_inputs
+    if args.save_profile == "bytes":
+        raise SystemExit("--incremental needs files on disk; use another --save-profile")
+    tpl = load_template(args.template, args.catalog)
+    plan_sha = None
+    if args.plan:
+        with open(args.plan, "rb") as f:
+            plan_sha = hashlib.sha256(f.read()).hexdigest()
+    inputs = build_inputs(tpl.digest, args.seed, args.save_profile, out=args.out, records=args.records,
+                          flatten=args.flatten, as_of=today().isoformat(), plan=plan_sha, scan=args.scan,
+                          scan_format=args.scan_format if args.scan else None, di_labels=args.di_labels)
+    build = BuildManifest(args.out, manifest)
+    wanted = range(args.start, args.start + args.count)
+    todo, fresh = build.plan(wanted, inputs)
+    pruned = build.prune(wanted) if args.prune else []
+    print(f"Incremental build: {len(todo)} to build, {len(fresh)} up to date, {len(pruned)} pruned")
+    return build, inputs, todo
+
+def main(argv=None):
+    global AS_OF
+    args = parse_args(argv)
+    AS_OF = args.as_of
+    metrics.enable(bool(args.metrics))
+    run_metrics = Metrics(enabled=True)
+    t_run = time.perf_counter()
+    manifest = args.manifest or os.path.join(args.out, "ground_truth.jsonl")
+    build, indexes, longrun = None, None, None
+    if args.incremental:
+        build, inputs, indexes = plan_incremental(args, manifest)
+    if args.recycle_after or args.soft_limit_mb or args.hard_limit_mb or args.memory_profile:
+        from long_run import LongRun
+        longrun = LongRun(args.recycle_after, args.soft_limit_mb, args.hard_limit_mb)
+    batch = generate_batch(args.start, args.count, args.seed, args.workers, args.chunk_size, indexes, longrun,
+                           out_dir=args.out, template=args.template, di_labels=args.di_labels,
+                           records=args.records, save_profile=args.save_profile, flatten=args.flatten,
+                           catalog=args.catalog, plan=args.plan, scan=args.scan, scan_format=args.scan_format)
+    save_times, sizes = [], []
+    try:
+        with ManifestWriter(manifest, append=True) as mf:
+            for res in batch:
+                offset, length = mf.write(res["record"])
+                if build:
+                    build.record(res["record"]["index"], inputs, output_files(res), offset, length)
+                run_metrics.merge(res["metrics"])
+                save_times.append(res["save_seconds"])
+                sizes.append(res["bytes"])
+                if res["missing"]:
+                    print(f"Fields not found in {args.template}: {', '.join(sorted(set(res['missing'])))}")
+                if res["unflattened"]:
+                    print(f"{res['file']}: {res['unflattened']} widget(s) could not be flattened")
+                if res["data"] is None:
+                    print(f"Wrote: {res['file']}")
+                if "scan" in res["record"]:
+                    print(f"Wrote: {res['record']['scan']}")
+        if build:
+            build.compact()
+    finally:
+        if build:
+            build.close()
+    print(f"Wrote: {manifest}")
+    print_save_summary(args.save_profile, save_times, sizes)
+    if longrun:
+        longrun.print_summary()
+        if args.memory_profile:
+            longrun.write_profile(args.memory_profile)
+            print(f"Wrote: {args.memory_profile}")
+    if args.metrics:
+        os.makedirs(os.path.dirname(args.metrics) or ".", exist_ok=True)
+        run_metrics.write_json(args.metrics + ".json", template=args.template, seed=args.seed,
+                               start=args.start, count=args.count, workers=args.workers,
+                               save_profile=args.save_profile, wall_seconds=time.perf_counter() - t_run)
+        run_metrics.write_prometheus(args.metrics + ".prom")
+        print(f"Wrote: {args.metrics}.json, {args.metrics}.prom")
 
 if __name__ == "__main__":
     main()
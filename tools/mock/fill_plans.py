@@ -0,0 +1,361 @@
+# fill_plans.py  (declarative form specs compiled into per-template fill plans)
+#
+# A spec (specs/*.json) names what to write, a compiled plan knows where:
+#   groups    - plain fields, each with a typed value generator
+#   exclusive - radio-style checkbox sets: exactly one option on, the rest off
+#   toggles   - a checkbox switched on with probability p, plus fields filled only when on
+#   rows      - repeating rows, read from a list in the context (e.g. loss history)
+#               or generated per document from a "generate" block
+# Steps run in that order. Field names are resolved against the template once in
+# load_plan(); Plan.run() only evaluates generators and writes by xref.
+#
+# Generators draw from the stdlib `random` stream and from ctx["fake"] (the
+# caller's seeded Faker), with dates relative to ctx["today"]; the generator
+# seeds and pins both per document, so a spec fills the same way every run.
+import argparse, json, os, random, re
+from datetime import date, datetime, timedelta
+
+from field_writes import WTYPE_CHECKBOX, write_pages
+from formatting import money, fmt_phone, mk_company_domain
+from metrics import METRICS
+from template_cache import load_template
+
+SPEC_DIR = "specs"
+# Context keys that only make_record() provides; plans that read none of them skip it
+RECORD_KEYS = frozenset({"record", "entity", "losses"})
+
+def _add_years(d: date, n: int) -> date:
+    try:
+        return d.replace(year=d.year + n)
+    except ValueError:   # Feb 29 -> Feb 28
+        return d.replace(year=d.year + n, day=28)
+
+def _initials(text: str) -> str:
+    return "".join(w[0] for w in str(text).split() if w).upper()[:3]
+
+# same_as transforms
+TRANSFORMS = {"domain": mk_company_domain, "initials": _initials}
+
+def _value_gen(spec: dict, field_name: str, uses: set | None = None):
+    """
+    Typed value generator -> callable(ctx, values_so_far). Every type takes
+    optional "prefix"/"suffix" strings. uses, if given, collects the context
+    keys the generator reads.
+    """
+    fn = _base_gen(spec, field_name, uses if uses is not None else set())
+    prefix, suffix = spec.get("prefix", ""), spec.get("suffix", "")
+    if prefix or suffix:
+        return lambda ctx, vals: f"{prefix}{fn(ctx, vals)}{suffix}"
+    return fn
+
+def _base_gen(spec: dict, field_name: str, uses: set):
+    t = spec.get("type", "const")
+    if t == "record":
+        key = spec.get("key", field_name)
+        uses.add("record")
+        return lambda ctx, vals: ctx["record"].get(key, "")
+    if t == "context":
+        key = spec["key"]
+        uses.add(key)
+        return lambda ctx, vals: ctx.get(key)
+    if t == "const":
+        v = spec.get("value", "")
+        return lambda ctx, vals: v
+    if t == "int":
+        lo, hi = spec["lo"], spec["hi"]
+        return lambda ctx, vals: str(random.randint(lo, hi))
+    if t == "money":
+        lo, hi = spec["lo"], spec["hi"]
+        return lambda ctx, vals: money(lo, hi)
+    if t == "phone":
+        return lambda ctx, vals: fmt_phone()
+    if t == "date":
+        # ctx["today"] (or the date already written to field "from") + years + a random day offset
+        lo, hi = spec.get("offset_days", [0, 0])
+        years = spec.get("years", 0)
+        fmt = spec.get("format", "%m/%d/%Y")
+        base = spec.get("from")
+        base_fmt = spec.get("from_format", "%m/%d/%Y")
+
+        def date_value(ctx, vals):
+            d = datetime.strptime(vals[base], base_fmt).date() if base else ctx["today"]
+            if years:
+                d = _add_years(d, years)
+            return (d + timedelta(days=random.randint(lo, hi))).strftime(fmt)
+        return date_value
+    if t == "choice":
+        options = list(spec["options"])
+        return lambda ctx, vals: random.choice(options)
+    if t == "bool":
+        p = spec.get("p", 0.5)
+        return lambda ctx, vals: random.random() < p
+    if t == "faker":
+        provider = spec["provider"]
+        args = list(spec.get("args", []))
+        return lambda ctx, vals: getattr(ctx["fake"], provider)(*args)
+    if t == "same_as":
+        other = spec["field"]
+        transform = spec.get("transform")
+        if transform is None:
+            return lambda ctx, vals: vals.get(other, "")
+        if transform not in TRANSFORMS:
+            raise ValueError(f"{field_name}: unknown transform {transform!r}")
+        f = TRANSFORMS[transform]
+        return lambda ctx, vals: f(vals.get(other, ""))
+    if t == "format":
+        # str.format over named sub-generators: {"format": "{biz}: ...", "args": {"biz": {...}}}
+        template = spec["format"]
+        args = {k: _value_gen(v, f"{field_name}.{k}", uses) for k, v in spec.get("args", {}).items()}
+        return lambda ctx, vals: template.format(**{k: a(ctx, vals) for k, a in args.items()})
+    raise ValueError(f"{field_name}: unknown value type {t!r}")
+
+class Plan:
+    """
+    A spec compiled against one template: every field name is already
+    resolved to its (page, xref, type) targets. needs_record tells the caller
+    whether the plan reads make_record() output (record/entity/losses) or
+    generates every value itself.
+    """
+    def __init__(self, spec: dict, tpl):
+        self.form = spec.get("form", "")
+        self.template_sha256 = tpl.digest
+        self.missing = []
+        self.steps = []
+        uses = set()
+        for group in spec.get("groups", []):
+            for fname, vspec in group["fields"].items():
+                self.steps.append(("field", self._targets(tpl, fname), fname, _value_gen(vspec, fname, uses), None))
+        for ex in spec.get("exclusive", []):
+            options = [(key, self._targets(tpl, fname), fname) for key, fname in ex["options"].items()]
+            self.steps.append(("exclusive", ex["name"], _value_gen(ex["select"], ex["name"], uses), options))
+        for tg in spec.get("toggles", []):
+            fields = [(self._targets(tpl, f), f, _value_gen(v, f, uses)) for f, v in tg.get("fields", {}).items()]
+            self.steps.append(("toggle", self._targets(tpl, tg["check"]), tg["check"], tg.get("p", 0.5), fields))
+        for rows in spec.get("rows", []):
+            columns = {col: [(self._targets(tpl, f), f) for f in names] for col, names in rows["columns"].items()}
+            empty = rows.get("empty_indicator")
+            total = rows.get("total")
+            make = rows.get("generate")
+            if make:
+                make = (_value_gen(make["count"], f"{rows['name']}.count", uses),
+                        {col: _value_gen(v, f"{rows['name']}.{col}", uses) for col, v in make["columns"].items()})
+            else:
+                uses.add(rows["source"])
+            self.steps.append(("rows", rows["source"], make, columns, set(rows.get("checkbox_columns", [])),
+                               (self._targets(tpl, empty), empty) if empty else None,
+                               (total["column"], self._targets(tpl, total["field"]), total["field"]) if total else None))
+        self.needs_record = bool(uses & RECORD_KEYS)
+
+    def _targets(self, tpl, fname):
+        targets = tpl.index.get(fname.strip(), [])
+        if not targets:
+            self.missing.append(fname)
+        return targets
+
+    def run(self, doc, ctx: dict, written: dict | None = None):
+        """
+        Evaluate generators for one document and write them.
+        ctx: { "fake": seeded Faker, "today": date, "index": int, plus
+               "record"/"entity"/"losses" from make_record() when needs_record }
+        Afterwards ctx["values"] maps every written field to its value, each
+        exclusive set's choice is in ctx[<name>] and generated rows in ctx[<source>].
+        Returns the field names that did not resolve at compile time.
+        """
+        by_page = {}
+        vals = {}
+
+        def put(targets, fname, value, force):
+            vals[fname] = value
+            for pno, xref, ftype in targets:
+                by_page.setdefault(pno, {})[xref] = (fname, ftype, value, force)
+
+        for step in self.steps:
+            kind = step[0]
+            if kind == "field":
+                _, targets, fname, value_fn, force = step
+                put(targets, fname, value_fn(ctx, vals), force)
+            elif kind == "exclusive":
+                _, name, select_fn, options = step
+                chosen = ctx[name] = select_fn(ctx, vals)
+                for key, targets, fname in options:
+                    put(targets, fname, key == chosen, True)
+            elif kind == "toggle":
+                _, targets, fname, p, fields = step
+                on = random.random() < p
+                put(targets, fname, on, True)
+                for f_targets, f_name, value_fn in fields:
+                    put(f_targets, f_name, value_fn(ctx, vals) if on else "", None)
+            elif kind == "rows":
+                _, source, make, columns, checkbox_cols, empty, total = step
+                if make:
+                    count_fn, col_fns = make
+                    items = []
+                    for _ in range(int(count_fn(ctx, vals))):
+                        row = {}
+                        for col, value_fn in col_fns.items():
+                            row[col] = value_fn(ctx, row)   # "same_as"/"from" refer to this row's columns
+                        items.append(row)
+                    ctx[source] = items
+                items = ctx.get(source) or []
+                n_rows = min(len(names) for names in columns.values()) if columns else 0
+                if not items:
+                    if empty:
+                        put(empty[0], empty[1], True, True)
+                    continue
+                total_sum = 0
+                for r, item in enumerate(items[:n_rows]):
+                    for col, cells in columns.items():
+                        targets, fname = cells[r]
+                        put(targets, fname, item[col], col in checkbox_cols or False)
+                    if total:
+                        total_sum += int(re.sub(r"[^\d]", "", str(item.get(total[0], ""))) or "0")
+                if total and total_sum:
+                    put(total[1], total[2], f"${total_sum:,}", False)
+
+        ctx["values"] = vals
+        write_pages(doc, by_page, written)
+        METRICS.inc("fields_not_found", len(self.missing))
+        return self.missing
+
+# (spec path, mtime, template sha256) -> Plan; compiled once per process
+_PLANS = {}
+
+def load_spec(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def load_plan(spec_path: str, tpl) -> Plan:
+    key = (os.path.abspath(spec_path), os.stat(spec_path).st_mtime_ns, tpl.digest)
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = _PLANS[key] = Plan(load_spec(spec_path), tpl)
+    return plan
+
+# ---- spec seeding from inspect_fields output --------------------------------
+
+_TEXT_GUESSES = [
+    # (field-name fragment, value generator)
+    ("EmailAddress",        {"type": "faker", "provider": "company_email"}),
+    ("PhoneNumber",         {"type": "phone"}),
+    ("FaxNumber",           {"type": "phone"}),
+    ("Date",                {"type": "date", "offset_days": [-365, 0]}),
+    ("Amount",              {"type": "money", "lo": 500, "hi": 10000}),
+    ("PostalCode",          {"type": "faker", "provider": "zipcode"}),
+    ("StateOrProvinceCode", {"type": "faker", "provider": "state_abbr"}),
+    ("CityName",            {"type": "faker", "provider": "city"}),
+    ("LineOne",             {"type": "faker", "provider": "street_address"}),
+    ("Insurer_FullName",    {"type": "faker", "provider": "company"}),
+    ("Producer_FullName",   {"type": "faker", "provider": "company"}),
+    ("NamedInsured_FullName", {"type": "faker", "provider": "company"}),
+    ("FullName",            {"type": "faker", "provider": "name"}),
+    ("Count",               {"type": "int", "lo": 1, "hi": 50}),
+    ("Identifier",          {"type": "int", "lo": 100000, "hi": 999999}),
+]
+_ROW_SUFFIX = re.compile(r"^(?P<stem>.+)_(?P<row>[A-Z])\[0\]$")
+_INDICATOR = re.compile(r"^(?P<prefix>.+_)[A-Za-z]+Indicator_[A-Z]\[0\]$")
+
+def _guess(field):
+    if field["field_type"] == WTYPE_CHECKBOX:
+        return {"type": "bool", "p": 0.5}
+    for fragment, vspec in _TEXT_GUESSES:
+        if fragment in field["field_name"]:
+            return dict(vspec)
+    return {"type": "const", "value": ""}
+
+def seed_spec(fields: list, form: str, template: str) -> dict:
+    """
+    Skeleton spec from inspect_fields rows. Checkbox sets sharing a
+    '<prefix>_<X>Indicator' name become exclusive groups; text fields that
+    differ only in their _A/_B/_C suffix become repeating rows; everything
+    else lands in one group per page with a generator guessed from its name.
+    Meant to be edited by hand afterwards.
+    """
+    names = [f for f in fields if f["field_name"]]
+    by_prefix = {}
+    for f in names:
+        m = _INDICATOR.match(f["field_name"])
+        if f["field_type"] == WTYPE_CHECKBOX and m:
+            by_prefix.setdefault(m.group("prefix"), []).append(f["field_name"])
+    exclusive = []
+    taken = set()
+    for prefix, members in sorted(by_prefix.items()):
+        if len(members) >= 3:
+            options = {re.sub(r"Indicator_[A-Z]\[0\]$", "", m[len(prefix):]): m for m in members}
+            exclusive.append({"name": prefix.split(".")[-1].rstrip("_"),
+                              "select": {"type": "choice", "options": sorted(options)}, "options": options})
+            taken.update(members)
+
+    by_stem = {}
+    for f in names:
+        m = _ROW_SUFFIX.match(f["field_name"])
+        if m and f["field_name"] not in taken and f["field_type"] != WTYPE_CHECKBOX:
+            by_stem.setdefault(m.group("stem"), []).append(f["field_name"])
+    row_groups = {}
+    for stem, members in by_stem.items():
+        if len(members) >= 3:
+            # group columns that share a section prefix (e.g. LossHistory_*) into one row set
+            section = stem.split(".")[-1].split("_")[0]
+            row_groups.setdefault(section, {})[stem.split(".")[-1]] = sorted(members)
+            taken.update(members)
+    rows = [{"name": section, "source": section, "columns": cols}
+            for section, cols in sorted(row_groups.items()) if len(cols) >= 2]
+    for section, cols in row_groups.items():
+        if len(cols) < 2:
+            taken.difference_update(m for members in cols.values() for m in members)
+
+    groups = {}
+    for f in names:
+        if f["field_name"] not in taken:
+            groups.setdefault(f"page_{f['page']}", {})[f["field_name"]] = _guess(f)
+    return {
+        "form": form,
+        "template": template,
+        "groups": [{"name": g, "fields": flds} for g, flds in groups.items()],
+        "exclusive": exclusive,
+        "toggles": [],
+        "rows": rows,
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Seed or check declarative fill specs.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    init = sub.add_parser("init", help="write a skeleton spec from a template's fields")
+    init.add_argument("template")
+    init.add_argument("--form", default=None, help="form name (default: template file stem)")
+    init.add_argument("--catalog", default=None, help="inspect_fields catalog to read fields from")
+    init.add_argument("-o", "--out", default=None, help=f"spec path (default {SPEC_DIR}/<stem>.json)")
+    check = sub.add_parser("check", help="compile a spec against its template and list unresolved fields")
+    check.add_argument("spec")
+    check.add_argument("--template", default=None, help="override the spec's template path")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "init":
+        import inspect_fields
+        stem = os.path.splitext(os.path.basename(args.template))[0]
+        tpl = load_template(args.template)
+        fields = None
+        if args.catalog:
+            con = inspect_fields.open_catalog(args.catalog)
+            try:
+                fields = inspect_fields.catalog_fields(con, tpl.digest)
+            finally:
+                con.close()
+        if fields is None:
+            fields = inspect_fields.inspect_template(args.template)[1]
+        spec = seed_spec(fields, args.form or stem, os.path.basename(args.template))
+        out = args.out or os.path.join(SPEC_DIR, f"{stem}.json")
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(spec, f, indent=2, ensure_ascii=False)
+        print(f"Wrote: {out}")
+    else:
+        spec = load_spec(args.spec)
+        template = args.template or os.path.join(os.path.dirname(os.path.abspath(args.spec)), "..", spec["template"])
+        plan = Plan(spec, load_template(template))
+        print(f"{spec.get('form', args.spec)}: {len(plan.steps)} steps compiled")
+        for name in plan.missing:
+            print(f"  not in template: {name}")
+        return 1 if plan.missing else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,35 @@
+# formatting.py  (value formats and tables shared by the generator, mock_records and fill_plans)
+#
+# Kept out of fill_acord125_fitz.py: run as a script the generator is __main__,
+# so importing it from another module would load a second copy with its own
+# AS_OF, METRICS and template cache.
+import random, re
+from datetime import date
+
+INDUSTRIES = [
+    ("Construction Contractor", "236115"),
+    ("Restaurant", "722511"),
+    ("Retail Clothing Store", "448140"),
+    ("Medical Office", "621111"),
+    ("IT Consulting Firm", "541512"),
+    ("Real Estate Agency", "531210"),
+    ("Trucking & Logistics", "484110"),
+    ("Manufacturing", "333120"),
+    ("Landscaping Services", "561730"),
+    ("Non-Profit Organization", "813110"),
+]
+
+def money(lo, hi):
+    return f"${random.randrange(lo, hi):,}"
+
+def fmt_phone():
+    return f"({random.randint(201,989)}) {random.randint(200,999)}-{random.randint(1000,9999)}"
+
+def plus_year(d):
+    try:
+        return d.replace(year=d.year + 1)
+    except ValueError:
+        return d + (date(d.year + 1, 3, 1) - date(d.year, 3, 1))
+
+def mk_company_domain(name:str) -> str:
+    return "https://" + re.sub(r"[^a-z0-9]+", "", name.lower()) + ".com"
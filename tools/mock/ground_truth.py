@@ -0,0 +1,111 @@
+# ground_truth.py  (labels captured during the fill, no OCR pass needed)
+import json, os
+
+WTYPE_CHECKBOX = 2
+
+# Azure Document Intelligence custom-model label file schema
+DI_LABELS_SCHEMA = "https://schema.cognitiveservices.azure.com/formrecognizer/2021-03-01/labels.json"
+
+def build_record(tpl, written: dict, out_pdf: str, index: int, seed: int, missing=None):
+    """
+    One ground-truth record per document from fill_fields(..., written=...).
+    Pages are 1-based and bboxes are [left, top, right, bottom] in PDF points,
+    the same conventions as inspect_fields.py.
+    """
+    fields = []
+    for xref, (fname, pno, ftype, is_checkbox, value) in written.items():
+        meta = tpl.by_xref.get(xref)
+        f = {
+            "field_name": fname,
+            "page": pno + 1,
+            "bbox": meta["rect"] if meta else None,
+            "field_type": ftype,
+        }
+        if ftype == WTYPE_CHECKBOX:
+            # A text write on a checkbox widget leaves it unchecked
+            f["checked"] = bool(value) if is_checkbox else False
+            f["value"] = f["checked"]
+        else:
+            # Forced-checkbox writes on a text widget show up as Yes/Off text
+            f["value"] = ("Yes" if value else "Off") if is_checkbox else value
+            f["checked"] = None
+        fields.append(f)
+    return {
+        "file": out_pdf,
+        "index": index,
+        "seed": seed,
+        "template": os.path.basename(tpl.path),
+        "template_sha256": tpl.digest,
+        "missing": sorted(set(missing or [])),
+        "fields": fields,
+    }
+
+def _polygon(rect, page_size):
+    """[l,t,r,b] in points -> normalized 8-point polygon (clockwise from top-left)."""
+    w, h = page_size
+    l, t, r, b = rect
+    l, r = l / w, r / w
+    t, b = t / h, b / h
+    return [l, t, r, t, r, b, l, b]
+
+def di_labels(record: dict, tpl) -> dict:
+    """
+    Document Intelligence `<file>.labels.json` for a record. Empty text fields
+    are left out; checkboxes are always labeled as selection marks.
+    """
+    labels = []
+    for f in record["fields"]:
+        if f["bbox"] is None:
+            continue
+        box = _polygon(f["bbox"], tpl.page_sizes[f["page"] - 1])
+        if f["checked"] is not None:
+            labels.append({
+                "label": f["field_name"],
+                "labelType": "selectionMark",
+                "value": [{"page": f["page"], "text": "selected" if f["checked"] else "unselected",
+                           "boundingBoxes": [box]}],
+            })
+        elif f["value"] != "":
+            labels.append({
+                "label": f["field_name"],
+                "value": [{"page": f["page"], "text": f["value"], "boundingBoxes": [box]}],
+            })
+    return {
+        "$schema": DI_LABELS_SCHEMA,
+        "document": os.path.basename(record["file"]),
+        "labels": labels,
+    }
+
+def write_di_labels(record: dict, tpl) -> str:
+    path = record["file"] + ".labels.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(di_labels(record, tpl), f, indent=2)
+    return path
+
+class ManifestWriter:
+    """
+    Append one JSON line per document; flushed per record so a killed run keeps what it wrote.
+    append=True continues an existing file, so shards sharing an out dir keep each
+    other's lines (a rerun document then has several; readers keep the last).
+    write() returns the line's (byte offset, length).
+    """
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fh = open(path, "ab" if append else "wb")
+
+    def write(self, record: dict):
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        offset = self._fh.tell()
+        self._fh.write(line)
+        self._fh.flush()
+        return offset, len(line)
+
+    def close(self):
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,11 +1,13 @@
 # inspect_fields.py  (drop-in replacement)
 import fitz  # PyMuPDF
-import csv, json, os
+import argparse, csv, hashlib, json, os, sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 TEMPLATE = "Acord-125-Commercial-Insurance-Application.pdf"
 OUT_DIR = "out"
-os.makedirs(OUT_DIR, exist_ok=True)
+CATALOG = os.path.join(OUT_DIR, "field_catalog.sqlite")
+LEGEND = "field_type_legend.txt"
 
 # Numeric widget type legend (stable across PyMuPDF versions)
 TYPE_LEGEND = {
@@ -18,6 +20,36 @@ TYPE_LEGEND = {
     7: "Text",
 }
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS templates (
+    sha256      TEXT PRIMARY KEY,
+    name        TEXT NOT NULL,
+    pages       INTEGER NOT NULL,
+    field_count INTEGER NOT NULL,
+    inspected   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS template_paths (
+    path     TEXT PRIMARY KEY,
+    sha256   TEXT NOT NULL REFERENCES templates(sha256),
+    mtime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fields (
+    template        TEXT NOT NULL REFERENCES templates(sha256),
+    page            INTEGER NOT NULL,
+    xref            INTEGER NOT NULL,
+    field_name      TEXT NOT NULL,
+    field_type      INTEGER,
+    field_type_name TEXT,
+    left REAL, top REAL, right REAL, bottom REAL,
+    value           TEXT,
+    choices         TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_fields_template ON fields(template);
+CREATE INDEX IF NOT EXISTS ix_fields_name     ON fields(field_name);
+CREATE INDEX IF NOT EXISTS ix_fields_page     ON fields(template, page);
+"""
+
 def _choice_values(widget):
     """Return choice option values robustly across PyMuPDF versions."""
     for attr in ("choice_values", "choices", "options"):
@@ -29,9 +61,17 @@ def _choice_values(widget):
                 pass
     return []
 
-def main():
+def inspect_template(path: str):
+    """
+    Every widget of one PDF; returns (page_count, fields). Pages are 1-based.
+    Raises ValueError for encrypted PDFs and PDFs without form fields.
+    """
     fields = []
-    with fitz.open(TEMPLATE) as doc:
+    with fitz.open(path) as doc:
+        if doc.needs_pass:
+            raise ValueError("encrypted")
+        if not doc.is_form_pdf:
+            raise ValueError("no form fields")
         for page_ix, page in enumerate(doc, start=1):
             for w in (page.widgets() or []):
                 ft = getattr(w, "field_type", None)
@@ -40,6 +80,7 @@ def main():
                 choices = _choice_values(w) if ft in (4, 5) else []
                 fields.append({
                     "page": page_ix,
+                    "xref": w.xref,
                     "field_name": (w.field_name or "").strip(),
                     "field_type": ft,
                     "field_type_name": TYPE_LEGEND.get(ft, "Unknown"),
@@ -47,18 +88,136 @@ def main():
                     "value": val,
                     "choices": choices,
                 })
+        return len(doc), fields
+
+def _inspect_job(job):
+    """(path, digest, pages, fields, error); error is set instead of raising so one bad file never stops a folder."""
+    path, digest = job
+    try:
+        pages, fields = inspect_template(path)
+    except (ValueError, RuntimeError) as e:   # fitz.FileDataError is a RuntimeError
+        return path, digest, 0, [], str(e) or type(e).__name__
+    return path, digest, pages, fields, None
+
+def find_templates(paths):
+    """Expand files and directories (non-recursive) into a sorted list of PDF paths."""
+    found = set()
+    for p in paths:
+        if os.path.isdir(p):
+            found.update(os.path.join(p, n) for n in os.listdir(p) if n.lower().endswith(".pdf"))
+        else:
+            found.add(p)
+    return sorted(os.path.abspath(p) for p in found)
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def open_catalog(db_path: str = CATALOG):
+    con = sqlite3.connect(db_path)
+    con.executescript(SCHEMA)
+    return con
+
+def update_catalog(con, paths, workers: int = 1):
+    """
+    Inspect only templates whose content is not in the catalog yet.
+    Paths are re-hashed only when their (mtime, size) changed.
+    Returns (inspected, skipped, failed) with failed = [(path, reason)] for
+    files that are not readable form PDFs; those are left out of the catalog.
+    """
+    known_paths = {r[0]: r[1:] for r in con.execute("SELECT path, sha256, mtime_ns, size FROM template_paths")}
+    known_hashes = {r[0] for r in con.execute("SELECT sha256 FROM templates")}
+    todo, skipped, path_rows = {}, [], []
+    for path in paths:
+        st = os.stat(path)
+        prev = known_paths.get(path)
+        if prev and (prev[1], prev[2]) == (st.st_mtime_ns, st.st_size):
+            skipped.append(path)
+            continue
+        digest = _sha256_file(path)
+        path_rows.append((path, digest, st.st_mtime_ns, st.st_size))
+        if digest in known_hashes or digest in todo.values():
+            skipped.append(path)
+        else:
+            todo[path] = digest
+
+    jobs = list(todo.items())
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_inspect_job, jobs))
+    else:
+        results = [_inspect_job(j) for j in jobs]
+
+    failed = [(r[0], r[4]) for r in results if r[4]]
+    results = [r for r in results if not r[4]]
+    bad = {path for path, _ in failed}
+    path_rows = [row for row in path_rows if row[0] not in bad]
+
+    now = datetime.now().isoformat()
+    with con:
+        for path, digest, pages, fields, _ in results:
+            con.execute("INSERT OR REPLACE INTO templates VALUES (?,?,?,?,?)",
+                        (digest, os.path.basename(path), pages, len(fields), now))
+            con.execute("DELETE FROM fields WHERE template = ?", (digest,))
+            con.executemany(
+                "INSERT INTO fields VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                [(digest, f["page"], f["xref"], f["field_name"], f["field_type"], f["field_type_name"],
+                  *f["rect"], str(f["value"]), "|".join(map(str, f["choices"]))) for f in fields])
+        con.executemany("INSERT OR REPLACE INTO template_paths VALUES (?,?,?,?)", path_rows)
+    return [r[0] for r in results], skipped, failed
+
+def catalog_fields(con, digest: str):
+    """Catalog rows for one template as inspect_template() dicts, or None if not cataloged."""
+    rows = con.execute(
+        "SELECT page, xref, field_name, field_type, field_type_name, left, top, right, bottom, value, choices "
+        "FROM fields WHERE template = ? ORDER BY rowid", (digest,)).fetchall()
+    if not rows and not con.execute("SELECT 1 FROM templates WHERE sha256 = ?", (digest,)).fetchone():
+        return None
+    return [{
+        "page": r[0], "xref": r[1], "field_name": r[2], "field_type": r[3], "field_type_name": r[4],
+        "rect": [r[5], r[6], r[7], r[8]], "value": r[9], "choices": r[10].split("|") if r[10] else [],
+    } for r in rows]
+
+def catalog_widgets(db_path: str, digest: str):
+    """
+    Widget metadata in template_cache.scan_widgets() shape (0-based pages), so the
+    generator can build its field index without re-opening the PDF. None if absent.
+    """
+    if not os.path.exists(db_path):
+        return None
+    con = sqlite3.connect(db_path)
+    try:
+        fields = catalog_fields(con, digest)
+    finally:
+        con.close()
+    if fields is None:
+        return None
+    return [{"page": f["page"] - 1, "xref": f["xref"], "field_name": f["field_name"],
+             "field_type": f["field_type"], "rect": f["rect"]} for f in fields]
+
+def export_template(con, digest: str, name: str, out_dir: str = OUT_DIR):
+    """Legacy per-template fields.json / fields.csv, now named after the template."""
+    fields = catalog_fields(con, digest) or []
+    stem = os.path.splitext(name)[0]
+    os.makedirs(out_dir, exist_ok=True)
 
     # JSON
-    with open(os.path.join(OUT_DIR, "fields.json"), "w", encoding="utf-8") as jf:
+    json_path = os.path.join(out_dir, f"{stem}.fields.json")
+    with open(json_path, "w", encoding="utf-8") as jf:
         json.dump({
-            "template": TEMPLATE,
+            "template": name,
+            "sha256": digest,
             "generated": datetime.now().isoformat(),
             "count": len(fields),
             "fields": fields
         }, jf, indent=2)
 
     # CSV
-    with open(os.path.join(OUT_DIR, "fields.csv"), "w", newline="", encoding="utf-8") as cf:
+    csv_path = os.path.join(out_dir, f"{stem}.fields.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as cf:
         w = csv.writer(cf)
         w.writerow(["page","field_name","field_type","field_type_name","left","top","right","bottom","current_value","choices"])
         for f in fields:
@@ -67,13 +226,43 @@ def main():
                 f["page"], f["field_name"], f["field_type"], f["field_type_name"],
                 left, top, right, bottom, f["value"], "|".join(f["choices"])
             ])
+    return json_path, csv_path
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Inspect AcroForm fields of one or more templates into a catalog.")
+    ap.add_argument("paths", nargs="*", default=[TEMPLATE], help="template PDFs or directories of them")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--catalog", default=CATALOG, help=f"SQLite field catalog (default {CATALOG})")
+    ap.add_argument("--export", action="store_true", help="also write <template>.fields.json/.csv for inspected templates")
+    ap.add_argument("--out", default=OUT_DIR, help=f"directory for exports and the type legend (default {OUT_DIR})")
+    args = ap.parse_args(argv)
+
+    paths = find_templates(args.paths)
+    os.makedirs(os.path.dirname(args.catalog) or ".", exist_ok=True)
+    con = open_catalog(args.catalog)
+    try:
+        inspected, skipped, failed = update_catalog(con, paths, args.workers)
+        for path in inspected:
+            print(f"Inspected: {path}")
+        for path, reason in failed:
+            print(f"Skipped (not a usable form: {reason}): {path}")
+        if skipped:
+            print(f"Skipped (unchanged or duplicate content): {len(skipped)} template(s)")
+        if args.export:
+            for path in inspected:
+                digest = con.execute("SELECT sha256 FROM template_paths WHERE path = ?", (path,)).fetchone()[0]
+                print("Wrote: " + ", ".join(export_template(con, digest, os.path.basename(path), args.out)))
+    finally:
+        con.close()
 
     # Legend file
-    with open(os.path.join(OUT_DIR, "field_type_legend.txt"), "w", encoding="utf-8") as lf:
+    os.makedirs(args.out, exist_ok=True)
+    legend = os.path.join(args.out, LEGEND)
+    with open(legend, "w", encoding="utf-8") as lf:
         for k, v in sorted(TYPE_LEGEND.items()):
             lf.write(f"{k} = {v}\n")
 
-    print("Wrote: out/fields.json, out/fields.csv, out/field_type_legend.txt")
+    print(f"Wrote: {args.catalog}, {legend}")
 
 if __name__ == "__main__":
     main()
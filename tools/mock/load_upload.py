@@ -0,0 +1,344 @@
+# load_upload.py  (asyncio load generator: in-memory PDFs -> POST /api/documents/upload -> poll until processed)
+import argparse, asyncio, json, os, ssl, sys, time, uuid
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from urllib.parse import urlsplit
+
+import fill_acord125_fitz as gen
+
+DEFAULT_URL = "http://localhost:5000"
+UPLOAD_PATH = "/api/documents/upload"
+LOGIN_PATH = "/api/auth/login"
+DOC_PATH = "/api/documents/{}"
+# DocumentStatus values as serialized by the API
+STATUS_COMPLETED, STATUS_FAILED = 2, 3
+
+class HttpPool:
+    """
+    Minimal HTTP/1.1 client over asyncio streams with a bounded keep-alive
+    connection pool. At most `size` sockets are open; idle ones are reused.
+    """
+    def __init__(self, base_url: str, size: int = 8, timeout: float = 60.0):
+        u = urlsplit(base_url)
+        if u.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {base_url}")
+        self.host = u.hostname
+        self.port = u.port or (443 if u.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if u.scheme == "https" else None
+        self.prefix = u.path.rstrip("/")
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle = []
+        self.opened = 0
+        self.requests = 0
+
+    async def _connect(self):
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: dict | None = None):
+        """Returns (status, body bytes). A stale idle connection is retried once on a fresh one."""
+        async with self._slots:
+            self.requests += 1
+            conn = self._idle.pop() if self._idle else None
+            for attempt in range(2):
+                reused = conn is not None
+                if conn is None:
+                    conn = await asyncio.wait_for(self._connect(), self.timeout)
+                try:
+                    status, data, keep = await asyncio.wait_for(
+                        self._roundtrip(conn, method, path, body, headers or {}), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn[1].close()
+                    conn = None
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    conn[1].close()
+                    raise
+                if keep:
+                    self._idle.append(conn)
+                else:
+                    conn[1].close()
+                return status, data
+
+    async def _roundtrip(self, conn, method, path, body, headers):
+        reader, writer = conn
+        head = [f"{method} {self.prefix}{path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                f"Content-Length: {len(body)}", "Connection: keep-alive"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if body:
+            writer.write(body)
+        await writer.drain()
+
+        status_line = await reader.readuntil(b"\r\n")
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+        resp = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            resp[k.strip().lower()] = v.strip()
+        keep = resp.get("connection", "").lower() != "close"
+        if resp.get("transfer-encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                parts.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b"".join(parts)
+        elif "content-length" in resp:
+            data = await reader.readexactly(int(resp["content-length"]))
+        elif status in (204, 304) or 100 <= status < 200:
+            data = b""
+        else:
+            data = await reader.read()
+            keep = False
+        return status, data, keep
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop()[1].close()
+
+def multipart(field: str, filename: str, data: bytes, content_type: str = "application/pdf"):
+    """(body, content-type header) for a single-file multipart/form-data upload."""
+    boundary = uuid.uuid4().hex
+    head = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n").encode()
+    return head + data + f"\r\n--{boundary}--\r\n".encode(), f"multipart/form-data; boundary={boundary}"
+
+class Pacer:
+    """Open-loop rate limit: request k is released at t0 + k/rate regardless of response times."""
+    def __init__(self, rate: float | None):
+        self.interval = 1 / rate if rate else 0
+        self.next = None
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        self.next = now if self.next is None else max(self.next, now)
+        t, self.next = self.next, self.next + self.interval
+        if t > now:
+            await asyncio.sleep(t - now)
+
+class LoadStats:
+    def __init__(self):
+        self.upload = []
+        self.e2e = []
+        self.generate = []
+        self.outcomes = Counter()
+        self.http = Counter()
+        self.bytes_sent = 0
+        self.errors = Counter()
+
+    def summary(self, elapsed: float):
+        def pct(vals):
+            st = sorted(vals)
+            if not st:
+                return None
+            return {"count": len(st), "mean_ms": round(sum(st) / len(st) * 1000, 1),
+                    **{f"p{int(q*100)}_ms": round(gen._percentile(st, q) * 1000, 1) for q in (.50, .95, .99)}}
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "uploads_per_sec": round(len(self.upload) / elapsed, 3) if elapsed else 0,
+            "completed_per_sec": round(self.outcomes["completed"] / elapsed, 3) if elapsed else 0,
+            "mb_sent": round(self.bytes_sent / 1e6, 2),
+            "outcomes": dict(self.outcomes),
+            "http_status": {str(k): v for k, v in sorted(self.http.items())},
+            "errors": dict(self.errors),
+            "generate": pct(self.generate),
+            "upload": pct(self.upload),
+            "end_to_end": pct(self.e2e),
+        }
+
+async def login(pool: HttpPool, email: str, password: str):
+    body = json.dumps({"email": email, "password": password}).encode()
+    status, data = await pool.request("POST", LOGIN_PATH, body, {"Content-Type": "application/json"})
+    payload = json.loads(data or b"{}")
+    # 2FA accounts get 200 with an empty token, so this comes before the token check
+    if status == 200 and payload.get("twoFactorRequired"):
+        raise RuntimeError("login requires a 2FA code; pass --token instead")
+    if status != 200 or not payload.get("token"):
+        raise RuntimeError(f"login failed ({status}): {payload.get('error') or data[:200]!r}")
+    return payload["token"]
+
+async def produce(queue: asyncio.Queue, pool_ex, indexes, seed: int, opts: dict, stats: LoadStats, inflight: int):
+    """Generate PDFs in worker processes (bytes profile, nothing on disk) and feed the upload queue in order."""
+    loop = asyncio.get_running_loop()
+    pending = deque()
+
+    async def emit():
+        t0, fut = pending.popleft()
+        res = await fut
+        stats.generate.append(time.perf_counter() - t0)
+        await queue.put((os.path.basename(res["file"]), res["data"]))
+
+    for i in indexes:
+        pending.append((time.perf_counter(), loop.run_in_executor(pool_ex, gen._generate_job, (i, seed, opts))))
+        if len(pending) >= inflight:
+            await emit()
+    while pending:
+        await emit()
+
+async def poll(http: HttpPool, auth: dict, doc_id: str, t0: float, stats: LoadStats, interval: float, timeout: float):
+    deadline = t0 + timeout
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(interval)
+        try:
+            status, data = await http.request("GET", DOC_PATH.format(doc_id), headers=auth)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            stats.errors[f"poll:{type(e).__name__}"] += 1
+            continue
+        stats.http[status] += 1
+        if status != 200:
+            continue
+        doc_status = json.loads(data).get("status")
+        if doc_status in (STATUS_COMPLETED, "Completed"):
+            stats.e2e.append(time.perf_counter() - t0)
+            stats.outcomes["completed"] += 1
+            return
+        if doc_status in (STATUS_FAILED, "Failed"):
+            stats.outcomes["failed"] += 1
+            return
+    stats.outcomes["poll_timeout"] += 1
+
+async def upload_worker(queue, http, auth, pacer, stats, pollers: set, args):
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        name, data = item
+        body, ctype = multipart("file", name, data)
+        del item, data
+        await pacer.wait()
+        t0 = time.perf_counter()
+        try:
+            status, resp = await http.request("POST", UPLOAD_PATH, body, {**auth, "Content-Type": ctype})
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            stats.errors[f"upload:{type(e).__name__}"] += 1
+            stats.outcomes["upload_error"] += 1
+            continue
+        stats.http[status] += 1
+        if status != 200:
+            stats.outcomes["rate_limited" if status == 429 else "rejected"] += 1
+            continue
+        stats.upload.append(time.perf_counter() - t0)
+        stats.bytes_sent += len(body)
+        stats.outcomes["uploaded"] += 1
+        if args.no_poll:
+            continue
+        doc_id = json.loads(resp)["documentId"]
+        task = asyncio.create_task(poll(http, auth, doc_id, t0, stats, args.poll_interval, args.poll_timeout))
+        pollers.add(task)
+        task.add_done_callback(pollers.discard)
+
+async def run(args, base_url: str):
+    stats = LoadStats()
+    http = HttpPool(base_url, size=args.connections, timeout=args.timeout)
+    token = args.token or await login(http, args.email, args.password)
+    auth = {"Authorization": f"Bearer {token}"}
+    opts = {"template": args.template, "records": args.records, "plan": args.plan, "save_profile": "bytes"}
+    queue = asyncio.Queue(maxsize=args.concurrency * 2)
+    pacer = Pacer(args.rate)
+    pollers = set()
+
+    t_run = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=gen._init_worker, initargs=(args.as_of, False)) as ex:
+        uploaders = [asyncio.create_task(upload_worker(queue, http, auth, pacer, stats, pollers, args))
+                     for _ in range(args.concurrency)]
+        await produce(queue, ex, range(args.start, args.start + args.count), args.seed, opts, stats,
+                      inflight=args.workers * 2)
+        for _ in uploaders:
+            await queue.put(None)
+        await asyncio.gather(*uploaders)
+    t_uploaded = time.perf_counter()
+    if pollers:
+        await asyncio.gather(*list(pollers))
+    elapsed = time.perf_counter() - t_run
+    await http.close()
+
+    summary = stats.summary(elapsed)
+    summary["upload_phase_seconds"] = round(t_uploaded - t_run, 3)
+    summary["connections_opened"] = http.opened
+    summary["requests"] = http.requests
+    return summary
+
+def print_summary(s: dict):
+    print(f"{s['outcomes'].get('uploaded', 0)} uploaded in {s['upload_phase_seconds']:.1f} s, "
+          f"{s['elapsed_seconds']:.1f} s total: {s['uploads_per_sec']:.2f} uploads/s, "
+          f"{s['completed_per_sec']:.2f} completed/s, {s['mb_sent']} MB sent")
+    print(f"  outcomes: {s['outcomes']}   http: {s['http_status']}")
+    if s["errors"]:
+        print(f"  errors: {s['errors']}")
+    print(f"  connections: {s['connections_opened']} opened for {s['requests']} requests")
+    for name in ("generate", "upload", "end_to_end"):
+        p = s[name]
+        if p:
+            print(f"  {name:<10} n={p['count']:<5} p50 {p['p50_ms']:>8.1f} ms  p95 {p['p95_ms']:>8.1f} ms  "
+                  f"p99 {p['p99_ms']:>8.1f} ms")
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Load-test the document upload API with in-memory mock ACORD 125 PDFs.")
+    ap.add_argument("--url", default=DEFAULT_URL, help=f"API base URL (default {DEFAULT_URL})")
+    ap.add_argument("--stub", action="store_true", help="start the local stand-in API (stub_api.py) and target it")
+    ap.add_argument("--count", type=int, default=50)
+    ap.add_argument("--start", type=int, default=0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--as-of", type=date.fromisoformat, default=None, help="pin today's date (YYYY-MM-DD)")
+    ap.add_argument("--template", default=gen.TEMPLATE)
+    ap.add_argument("--records", choices=("faker", "batch"), default="batch")
+    ap.add_argument("--plan", default=None, metavar="SPEC")
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="generator processes")
+    ap.add_argument("--concurrency", type=int, default=8, help="concurrent uploads")
+    ap.add_argument("--rate", type=float, default=None, help="max uploads per second (default: unpaced)")
+    ap.add_argument("--connections", type=int, default=16, help="HTTP keep-alive pool size (uploads + polls)")
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    ap.add_argument("--poll-interval", type=float, default=0.5, help="seconds between status polls")
+    ap.add_argument("--poll-timeout", type=float, default=300.0, help="give up on a document after this long")
+    ap.add_argument("--no-poll", action="store_true", help="measure uploads only")
+    ap.add_argument("--token", default=os.environ.get("ACORD_API_TOKEN"), help="bearer token (or ACORD_API_TOKEN)")
+    ap.add_argument("--email", default=os.environ.get("ACORD_API_EMAIL", "loadtest@example.com"))
+    ap.add_argument("--password", default=os.environ.get("ACORD_API_PASSWORD", ""))
+    ap.add_argument("--stub-processing-ms", type=float, default=1500)
+    ap.add_argument("--stub-fail-rate", type=float, default=0.0)
+    ap.add_argument("--out", default=None, help="write the summary JSON here")
+    args = ap.parse_args(argv)
+    if args.concurrency < 1 or args.connections < 1 or args.workers < 1:
+        ap.error("--concurrency, --connections and --workers must be >= 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    base_url, server = args.url, None
+    if args.stub:
+        import stub_api
+        server, base_url = stub_api.serve(processing_ms=args.stub_processing_ms, fail_rate=args.stub_fail_rate)
+        print(f"Stub API on {base_url}")
+    try:
+        summary = asyncio.run(run(args, base_url))
+    finally:
+        if server:
+            server.shutdown()
+    summary.update(url=base_url, count=args.count, concurrency=args.concurrency, rate=args.rate,
+                   connections=args.connections)
+    print_summary(summary)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Wrote: {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# long_run.py  (long-running batches: per-worker RSS tracking, MuPDF store shrinking, worker recycling)
+import csv, gc, multiprocessing as mp, os, resource, sys, time, traceback
+from collections import Counter, deque
+from itertools import count
+from multiprocessing.connection import wait
+
+import fitz  # PyMuPDF
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE / (1 << 20)
+    except OSError:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+
+def _worker_main(wid, conn, job_fn, init_fn, initargs, recycle_after, soft_mb, hard_mb):
+    """Run jobs until told to stop, `recycle_after` documents are done, or RSS stays above hard_mb."""
+    init_fn(*initargs)
+    done = 0
+    while True:
+        job = conn.recv()
+        if job is None:
+            return
+        index = job[0]
+        try:
+            res = job_fn(job)
+        except Exception:
+            conn.send(("error", index, traceback.format_exc()))
+            return
+        done += 1
+        rss = after = rss_mb()
+        shrunk = bool(soft_mb) and rss > soft_mb
+        if shrunk:
+            # drop cached fonts/images/display lists and whatever pages/widgets are unreachable now
+            fitz.TOOLS.store_shrink(100)
+            gc.collect()
+            after = rss_mb()
+        res["memory"] = {"worker": wid, "pid": os.getpid(), "worker_docs": done,
+                         "rss_mb": round(rss, 1), "rss_after_mb": round(after, 1), "shrunk": shrunk}
+        # the exit reason rides on the result, so the parent never hands a job to a worker that is leaving
+        reason = ("documents" if recycle_after and done >= recycle_after
+                  else "hard_limit" if hard_mb and after > hard_mb else None)
+        conn.send(("done", index, res, reason))
+        if reason:
+            return
+
+class LongRun:
+    """
+    Settings and memory profile of a long-run batch. map() runs jobs on
+    worker processes that report RSS after every document, shrink the MuPDF
+    store above soft_mb, and are replaced after recycle_after documents or
+    when they stay above hard_mb. soft_mb defaults to hard_mb, so a worker
+    always shrinks before the hard limit is checked. A worker that dies
+    (e.g. OOM-killed) is replaced and its document retried once.
+    """
+    def __init__(self, recycle_after: int | None = None, soft_mb: float | None = None,
+                 hard_mb: float | None = None):
+        if hard_mb and soft_mb and hard_mb < soft_mb:
+            raise ValueError("hard memory limit must be >= the soft limit")
+        self.recycle_after = recycle_after
+        self.soft_mb = soft_mb or hard_mb
+        self.hard_mb = hard_mb
+        self.samples = []          # one per document: t, worker, pid, index, rss before/after shrink
+        self.events = Counter()    # spawned, recycled_documents, recycled_hard_limit, crashed, retried
+        self.t0 = None
+
+    def map(self, job_fn, jobs, workers: int, init_fn, initargs=(), inflight: int | None = None):
+        """
+        Ordered job_fn results; at most `inflight` (default 2*workers) jobs are
+        handed out or waiting to be yielded. Each worker has its own pipe and
+        gets one job at a time, so the parent always knows which document a
+        dead worker was on.
+        """
+        self.t0 = time.perf_counter()
+        inflight = inflight or 2 * workers
+        procs, busy, attempts = {}, {}, Counter()
+        submitted, retries, buffered, order = {}, deque(), {}, deque()
+        ids = count()
+        jobs = iter(jobs)
+
+        def spawn():
+            wid = next(ids)
+            parent, child = mp.Pipe()
+            p = mp.Process(target=_worker_main, daemon=True,
+                           args=(wid, child, job_fn, init_fn, initargs,
+                                 self.recycle_after, self.soft_mb, self.hard_mb))
+            p.start()
+            child.close()
+            procs[wid] = (p, parent)
+            self.events["spawned"] += 1
+
+        def retire(wid):
+            p, conn = procs.pop(wid)
+            conn.close()
+            p.join(timeout=5)
+
+        def next_job():
+            if retries:
+                return retries.popleft()
+            if len(order) >= inflight:
+                return None
+            job = next(jobs, None)
+            if job is not None:
+                submitted[job[0]] = job
+                order.append(job[0])
+            return job
+
+        def handle(wid, msg):
+            kind = msg[0]
+            if kind == "done":
+                busy.pop(wid, None)
+                buffered[msg[1]] = msg[2]
+                self.samples.append({"t": round(time.perf_counter() - self.t0, 3), "index": msg[1],
+                                     **msg[2]["memory"]})
+                if msg[3]:
+                    retire(wid)
+                    self.events[f"recycled_{msg[3]}"] += 1
+                    spawn()
+            elif kind == "error":
+                raise RuntimeError(f"document {msg[1]} failed in worker:\n{msg[2]}")
+
+        def crashed(wid):
+            retire(wid)
+            self.events["crashed"] += 1
+            index = busy.pop(wid, None)
+            if index is not None and index not in buffered:
+                attempts[index] += 1
+                if attempts[index] > 1:
+                    raise RuntimeError(f"document {index} killed its worker twice")
+                self.events["retried"] += 1
+                retries.append(submitted[index])
+            spawn()
+
+        try:
+            for _ in range(workers):
+                spawn()
+            while True:
+                while order and order[0] in buffered:
+                    index = order.popleft()
+                    submitted.pop(index, None)
+                    yield buffered.pop(index)
+                for wid, (p, conn) in list(procs.items()):
+                    if wid not in busy:
+                        job = next_job()
+                        if job is None:
+                            break
+                        try:
+                            conn.send(job)
+                        except OSError:
+                            # died between jobs; the document never started, so it doesn't count as an attempt
+                            retries.appendleft(job)
+                            crashed(wid)
+                            continue
+                        busy[wid] = job[0]
+                if not order:
+                    break
+                by_conn = {conn: wid for wid, (p, conn) in procs.items()}
+                by_sentinel = {p.sentinel: wid for wid, (p, conn) in procs.items()}
+                for obj in wait(list(by_conn) + list(by_sentinel)):
+                    wid = by_conn.get(obj, by_sentinel.get(obj))
+                    if wid not in procs:
+                        continue
+                    conn = procs[wid][1]
+                    try:
+                        # drain first: a worker that just exited may still have results queued
+                        while wid in procs and conn.poll():
+                            handle(wid, conn.recv())
+                    except (EOFError, OSError):   # OSError: it died with a job unread in its pipe
+                        procs[wid][0].join(timeout=5)
+                    if wid in procs and not procs[wid][0].is_alive():
+                        crashed(wid)
+        finally:
+            for p, conn in procs.values():
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+            for wid in list(procs):
+                p = procs[wid][0]
+                retire(wid)
+                if p.is_alive():
+                    p.terminate()
+
+    def summary(self, buckets: int = 10) -> dict:
+        """RSS statistics overall and per time slice of the run (the memory-over-time profile)."""
+        if not self.samples:
+            return {"events": dict(self.events)}
+        rss = sorted(s["rss_mb"] for s in self.samples)
+        end = self.samples[-1]["t"] or 1
+        timeline = []
+        for b in range(buckets):
+            lo, hi = end * b / buckets, end * (b + 1) / buckets
+            sl = sorted(s["rss_mb"] for s in self.samples if lo <= s["t"] < hi or (b == buckets - 1 and s["t"] == hi))
+            if sl:
+                timeline.append({"until_s": round(hi, 1), "docs": len(sl),
+                                 "rss_p50_mb": sl[len(sl) // 2], "rss_max_mb": sl[-1]})
+        return {
+            "events": dict(self.events),
+            "store_shrinks": sum(s["shrunk"] for s in self.samples),
+            "rss_p50_mb": rss[len(rss) // 2],
+            "rss_p95_mb": rss[min(len(rss) - 1, int(len(rss) * .95))],
+            "rss_max_mb": rss[-1],
+            "parent_rss_mb": round(rss_mb(), 1),
+            "timeline": timeline,
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        ev = s["events"]
+        print(f"Long run: {ev.get('spawned', 0)} workers spawned, "
+              f"{ev.get('recycled_documents', 0)} recycled after {self.recycle_after or '-'} docs, "
+              f"{ev.get('recycled_hard_limit', 0)} at the hard limit, {ev.get('crashed', 0)} crashed "
+              f"({ev.get('retried', 0)} documents retried)")
+        if "rss_max_mb" not in s:
+            return
+        print(f"  worker RSS: p50 {s['rss_p50_mb']} MB, p95 {s['rss_p95_mb']} MB, max {s['rss_max_mb']} MB; "
+              f"{s['store_shrinks']} store shrinks; parent {s['parent_rss_mb']} MB")
+        for row in s["timeline"]:
+            print(f"    <= {row['until_s']:>8.1f} s  {row['docs']:>6} docs  "
+                  f"RSS p50 {row['rss_p50_mb']:>7.1f} MB  max {row['rss_max_mb']:>7.1f} MB")
+
+    def write_profile(self, path: str):
+        """Per-document samples as CSV (t, worker, pid, index, worker_docs, rss_mb, rss_after_mb, shrunk)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        cols = ["t", "worker", "pid", "index", "worker_docs", "rss_mb", "rss_after_mb", "shrunk"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=cols, extrasaction="ignore")
+            w.writeheader()
+            w.writerows(self.samples)
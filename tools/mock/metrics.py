@@ -0,0 +1,98 @@
+# metrics.py  (opt-in counters/timers for the fill pipeline)
+import json, os, time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+PROM_PREFIX = "acord_mock"
+
+HELP = {
+    "documents":        "Documents generated",
+    "widgets_visited":  "Widgets loaded for a write",
+    "fields_written":   "Widget writes that succeeded",
+    "fields_not_found": "Assigned field names missing from the template",
+    "orphan_errors":    "Widget writes that raised RuntimeError (orphan/unbound annotation)",
+    "write_errors":     "Widget writes that raised any other exception",
+    "unflattened":      "Widgets left after flatten",
+    "bytes_written":    "Bytes of PDF output",
+    "scan_bytes_written": "Bytes of rasterized scan output",
+}
+
+class Metrics:
+    """
+    Process-local counters and stage timers. Disabled by default: inc() and
+    timer() return immediately, so the hooks can stay in the hot path.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.counters = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def inc(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def timer(self, stage: str):
+        return self._timer(stage) if self.enabled else nullcontext()
+
+    @contextmanager
+    def _timer(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] += time.perf_counter() - t0
+            self.calls[stage] += 1
+
+    def snapshot(self) -> dict:
+        return {"counters": dict(self.counters), "seconds": dict(self.seconds), "calls": dict(self.calls)}
+
+    def drain(self) -> dict | None:
+        """Snapshot and reset (workers ship per-document deltas back to the parent)."""
+        if not self.enabled:
+            return None
+        snap = self.snapshot()
+        self.counters.clear(); self.seconds.clear(); self.calls.clear()
+        return snap
+
+    def merge(self, snap: dict | None):
+        if not snap:
+            return
+        for k, v in snap["counters"].items():
+            self.counters[k] += v
+        for k, v in snap["seconds"].items():
+            self.seconds[k] += v
+        for k, v in snap["calls"].items():
+            self.calls[k] += v
+
+    def write_json(self, path: str, **extra):
+        data = {**extra, **self.snapshot()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def write_prometheus(self, path: str, prefix: str = PROM_PREFIX):
+        """node_exporter textfile format; written to a temp file and renamed so scrapes never see half a file."""
+        lines = []
+        for name in sorted(set(HELP) | set(self.counters)):
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {self.counters.get(name, 0)}")
+        lines.append(f"# HELP {prefix}_stage_seconds_total Wall time spent per pipeline stage")
+        lines.append(f"# TYPE {prefix}_stage_seconds_total counter")
+        for stage in sorted(self.seconds):
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {self.seconds[stage]:.6f}')
+        lines.append(f"# HELP {prefix}_stage_calls_total Times each pipeline stage ran")
+        lines.append(f"# TYPE {prefix}_stage_calls_total counter")
+        for stage in sorted(self.calls):
+            lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {self.calls[stage]}')
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+
+# Process-wide instance used by the fill pipeline; enable() turns it on.
+METRICS = Metrics()
+
+def enable(on: bool = True):
+    METRICS.enabled = on
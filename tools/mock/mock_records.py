@@ -0,0 +1,310 @@
+# mock_records.py  (columnar mock records; drop-in for build_mock at batch scale)
+import numpy as np
+from faker import Faker
+from datetime import date, timedelta
+from functools import lru_cache
+
+from formatting import INDUSTRIES, plus_year, mk_company_domain
+
+POOL_SIZE = 1024   # seeded Faker values per pool; sampled by index
+BLOCK     = 1024   # records computed together by record_for()
+
+ENTITIES       = ["Corporation", "LLC", "Partnership", "SubS", "NotForProfit", "Individual", "Trust", "JointVenture"]
+LOSS_COUNTS    = [0, 0, 1, 2]
+LOSS_LOBS      = ["Property", "General Liability", "Automobile"]
+LOSS_DESCS     = ["Minor water damage at premises", "Slip-and-fall claim", "Small theft incident", "Low-speed vehicle collision"]
+YN             = ["Y", "N"]
+PAY_SCHEDULES  = ["AN", "QT", "MO"]
+PAY_METHODS    = ["ACH", "Check", "Credit Card"]
+AUDIT_FREQS    = ["AN", "QT", "SEMI", "MO"]
+OPERATIONS     = ["sales", "service", "installation", "consulting"]
+
+# One uniform per column per record. Record i always reads row i of the same
+# counter-based stream, so its values never depend on batch boundaries.
+COLUMNS = (
+    "company", "address", "entity", "loss_count",
+    *(f"loss{k}_{c}" for k in range(2) for c in ("occ", "claim", "lob", "desc", "paid", "res", "subro", "open")),
+    "producer_company", "producer_address", "producer_contact", "producer_email",
+    *(f"{p}_{part}" for p in ("producer_phone", "producer_fax", "insured_phone") for part in ("area", "exch", "line")),
+    "producer_id", "subproducer_id", "customer_id", "insurer_company", "insurer_naic", "policy_number",
+    "pay_schedule", "pay_method", "audit_freq", "deposit", "min_premium", "est_total",
+    "gl_code", "sic_code", "tax_a", "tax_b", "member_count", "county",
+    "owner", "tenant", "ft_employees", "pt_employees", "revenue",
+    "occupied_area", "public_area", "building_area", "start_days", "operations",
+    "safety_manual", "safety_position", "safety_meetings", "safety_osha",
+    "prior_gl_company", "prior_gl_number", "prior_gl_premium",
+    "prior_prop_company", "prior_prop_number", "prior_prop_premium",
+    "auth_rep", "license_id", "national_id", "signer",
+)
+SLOT = {c: i for i, c in enumerate(COLUMNS)}
+WIDTH = -(-len(COLUMNS) // 4) * 4   # Philox emits 4 words per counter step
+
+# Integer columns: name -> (lo, hi) with hi exclusive (random.randrange semantics)
+INT_RANGES = {
+    **{f"loss{k}_occ": (400, 1801) for k in range(2)},
+    **{f"loss{k}_claim": (5, 61) for k in range(2)},
+    **{f"loss{k}_paid": (1000, 15001) for k in range(2)},
+    **{f"loss{k}_res": (0, 7001) for k in range(2)},
+    **{f"{p}_area": (201, 990) for p in ("producer_phone", "producer_fax", "insured_phone")},
+    **{f"{p}_exch": (200, 1000) for p in ("producer_phone", "producer_fax", "insured_phone")},
+    **{f"{p}_line": (1000, 10000) for p in ("producer_phone", "producer_fax", "insured_phone")},
+    "producer_id": (100000, 1000000), "subproducer_id": (1000, 10000), "customer_id": (10_000, 1_000_000),
+    "insurer_naic": (10000, 100000), "policy_number": (1000000, 10000000),
+    "deposit": (500, 2500), "min_premium": (500, 1500), "est_total": (3000, 19000),
+    "gl_code": (10000, 100000), "sic_code": (1000, 10000), "tax_a": (10, 100), "tax_b": (1000000, 10000000),
+    "member_count": (1, 6), "ft_employees": (3, 121), "pt_employees": (0, 51), "revenue": (250000, 8000000),
+    "occupied_area": (1500, 25001), "public_area": (0, 8001), "building_area": (2000, 35001),
+    "start_days": (365, 365*15 + 1),
+    "prior_gl_number": (100000, 1000000), "prior_gl_premium": (900, 5000),
+    "prior_prop_number": (100000, 1000000), "prior_prop_premium": (1200, 7000),
+    "license_id": (1000000, 10000000), "national_id": (100000000, 1000000000),
+}
+
+# Choice columns: name -> list of options
+CHOICES = {
+    "entity": ENTITIES, "loss_count": LOSS_COUNTS,
+    **{f"loss{k}_lob": LOSS_LOBS for k in range(2)},
+    **{f"loss{k}_desc": LOSS_DESCS for k in range(2)},
+    **{f"loss{k}_subro": YN for k in range(2)},
+    **{f"loss{k}_open": YN for k in range(2)},
+    "pay_schedule": PAY_SCHEDULES, "pay_method": PAY_METHODS, "audit_freq": AUDIT_FREQS,
+    "operations": OPERATIONS,
+}
+
+# Boolean columns (random.choice([True, False]))
+FLAGS = ("owner", "tenant", "safety_manual", "safety_position", "safety_meetings", "safety_osha")
+
+# Pool-sampled columns: name -> pool
+POOLED = {
+    "company": "companies", "producer_company": "companies", "insurer_company": "companies",
+    "prior_gl_company": "companies", "prior_prop_company": "companies",
+    "address": "addresses", "producer_address": "addresses",
+    "producer_contact": "names", "auth_rep": "names", "signer": "names",
+    "producer_email": "emails", "county": "cities",
+}
+
+@lru_cache(maxsize=4)
+def build_pools(seed: int, size: int = POOL_SIZE) -> dict:
+    """Seeded Faker pools, built once per (seed, size) per process."""
+    fake = Faker("en_US")
+    fake.seed_instance(seed)
+    return {
+        "companies": [fake.company() for _ in range(size)],
+        "addresses": [(fake.street_address(), fake.city(), fake.state_abbr(), fake.zipcode()) for _ in range(size)],
+        "names":     [fake.name() for _ in range(size)],
+        "emails":    [fake.company_email() for _ in range(size)],
+        "cities":    [fake.city() for _ in range(size)],
+    }
+
+def uniforms(seed: int, start: int, count: int) -> np.ndarray:
+    """(count, WIDTH) uniforms; row r is identical for index start+r whatever the start."""
+    bg = np.random.Philox(key=seed & 0xFFFF_FFFF_FFFF_FFFF)
+    bg.advance(start * WIDTH // 4)
+    return np.random.Generator(bg).random((count, WIDTH))
+
+class RecordBatch:
+    """
+    N mock records held as integer columns (values, choice indexes, pool
+    indexes). Strings are only formatted in record(i), right before a fill.
+    Dates are relative to as_of (default: the real date), which the caller
+    passes in so a pinned --as-of reaches every process.
+    """
+    def __init__(self, seed: int, start: int, count: int, pool_size: int = POOL_SIZE,
+                 as_of: date | None = None):
+        self.seed = seed
+        self.start = start
+        self.count = count
+        self.as_of = as_of or date.today()
+        self.pools = build_pools(seed, pool_size)
+        u = uniforms(seed, start, count)
+        cols = {}
+        for name, (lo, hi) in INT_RANGES.items():
+            cols[name] = lo + (u[:, SLOT[name]] * (hi - lo)).astype(np.int64)
+        for name, options in CHOICES.items():
+            cols[name] = (u[:, SLOT[name]] * len(options)).astype(np.int64)
+        for name in FLAGS:
+            cols[name] = u[:, SLOT[name]] < 0.5
+        for name, pool in POOLED.items():
+            cols[name] = (u[:, SLOT[name]] * len(self.pools[pool])).astype(np.int64)
+        self.cols = cols
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index: int):
+        """(data_map, entity_key, losses) for absolute index, same keys as build_mock()."""
+        r = index - self.start
+        if not 0 <= r < self.count:
+            raise IndexError(index)
+        c = {name: col[r].item() for name, col in self.cols.items()}
+        pools = self.pools
+
+        def pick(name):
+            return CHOICES[name][c[name]]
+
+        def pooled(name):
+            return pools[POOLED[name]][c[name]]
+
+        def money(name):
+            return f"${c[name]:,}"
+
+        def phone(p):
+            return f"({c[p + '_area']}) {c[p + '_exch']}-{c[p + '_line']}"
+
+        biz, naics = INDUSTRIES[index % len(INDUSTRIES)]
+        eff = self.as_of
+        exp = plus_year(eff)
+        company = pooled("company")
+        street, city, state, zipc = pooled("address")
+        p_street, p_city, p_state, p_zip = pooled("producer_address")
+        ent = pick("entity")
+
+        losses = []
+        for k in range(pick("loss_count")):
+            occ = eff - timedelta(days=c[f"loss{k}_occ"])
+            claim = occ + timedelta(days=c[f"loss{k}_claim"])
+            losses.append({
+                "occ": occ.strftime("%m/%d/%Y"),
+                "lob": pick(f"loss{k}_lob"),
+                "desc": pick(f"loss{k}_desc"),
+                "claim": claim.strftime("%m/%d/%Y"),
+                "paid": money(f"loss{k}_paid"),
+                "res":  money(f"loss{k}_res"),
+                "subro": pick(f"loss{k}_subro"),
+                "open": pick(f"loss{k}_open"),
+            })
+
+        eff_s = eff.strftime("%m/%d/%Y")
+        prior_eff = eff.replace(year=eff.year-1).strftime("%m/%d/%Y")
+        prior_exp = exp.replace(year=eff.year).strftime("%m/%d/%Y")
+        data = {
+            # Page 1 - producer / policy / named insured
+            "F[0].P1[0].Form_CompletionDate_A[0]": eff_s,
+            "F[0].P1[0].Producer_FullName_A[0]": f"{pooled('producer_company')} Insurance Agency",
+            "F[0].P1[0].Producer_MailingAddress_LineOne_A[0]": p_street,
+            "F[0].P1[0].Producer_MailingAddress_LineTwo_A[0]": "",
+            "F[0].P1[0].Producer_MailingAddress_CityName_A[0]": p_city,
+            "F[0].P1[0].Producer_MailingAddress_StateOrProvinceCode_A[0]": p_state,
+            "F[0].P1[0].Producer_MailingAddress_PostalCode_A[0]": p_zip,
+            "F[0].P1[0].Producer_ContactPerson_FullName_A[0]": pooled("producer_contact"),
+            "F[0].P1[0].Producer_ContactPerson_PhoneNumber_A[0]": phone("producer_phone"),
+            "F[0].P1[0].Producer_FaxNumber_A[0]": phone("producer_fax"),
+            "F[0].P1[0].Producer_ContactPerson_EmailAddress_A[0]": pooled("producer_email"),
+            "F[0].P1[0].Insurer_ProducerIdentifier_A[0]": str(c["producer_id"]),
+            "F[0].P1[0].Insurer_SubProducerIdentifier_A[0]": str(c["subproducer_id"]),
+            "F[0].P1[0].Producer_CustomerIdentifier_A[0]": str(c["customer_id"]),
+            "F[0].P1[0].Insurer_FullName_A[0]": pooled("insurer_company"),
+            "F[0].P1[0].Insurer_NAICCode_A[0]": str(c["insurer_naic"]),
+            "F[0].P1[0].Insurer_ProductDescription_A[0]": "Commercial Package",
+            "F[0].P1[0].Insurer_ProductCode_A[0]": "CPP",
+            "F[0].P1[0].Policy_PolicyNumberIdentifier_A[0]": f"NEW-{c['policy_number']}",
+            "F[0].P1[0].Policy_Status_QuoteIndicator_A[0]": True,
+            "F[0].P1[0].Policy_Status_IssueIndicator_A[0]": False,
+            "F[0].P1[0].Policy_Status_RenewIndicator_A[0]": False,
+            "F[0].P1[0].Policy_Status_BoundIndicator_A[0]": False,
+            "F[0].P1[0].Policy_Status_ChangeIndicator_A[0]": False,
+            "F[0].P1[0].Policy_Status_CancelIndicator_A[0]": False,
+            "F[0].P1[0].Policy_Status_EffectiveDate_A[0]": eff_s,
+            "F[0].P1[0].Policy_Status_EffectiveTime_A[0]": "12:01",
+            "F[0].P1[0].Policy_Status_EffectiveTimeAMIndicator_A[0]": False,
+            "F[0].P1[0].Policy_Status_EffectiveTimePMIndicator_A[0]": True,
+            "F[0].P1[0].Policy_EffectiveDate_A[0]": eff_s,
+            "F[0].P1[0].Policy_ExpirationDate_A[0]": exp.strftime("%m/%d/%Y"),
+            "F[0].P1[0].Policy_Payment_DirectBillIndicator_A[0]": True,
+            "F[0].P1[0].Policy_Payment_ProducerBillIndicator_A[0]": False,
+            "F[0].P1[0].Policy_Payment_PaymentScheduleCode_A[0]": pick("pay_schedule"),
+            "F[0].P1[0].Policy_PaymentMethod_MethodDescription_A[0]": pick("pay_method"),
+            "F[0].P1[0].Policy_Audit_FrequencyCode_A[0]": pick("audit_freq"),
+            "F[0].P1[0].Policy_Payment_DepositAmount_A[0]": money("deposit"),
+            "F[0].P1[0].Policy_Payment_MinimumPremiumAmount_A[0]": money("min_premium"),
+            "F[0].P1[0].Policy_Payment_EstimatedTotalAmount_A[0]": money("est_total"),
+
+            "F[0].P1[0].NamedInsured_FullName_A[0]": company,
+            "F[0].P1[0].NamedInsured_MailingAddress_LineOne_A[0]": street,
+            "F[0].P1[0].NamedInsured_MailingAddress_LineTwo_A[0]": "",
+            "F[0].P1[0].NamedInsured_MailingAddress_CityName_A[0]": city,
+            "F[0].P1[0].NamedInsured_MailingAddress_StateOrProvinceCode_A[0]": state,
+            "F[0].P1[0].NamedInsured_MailingAddress_PostalCode_A[0]": zipc,
+            "F[0].P1[0].NamedInsured_GeneralLiabilityCode_A[0]": str(c["gl_code"]),
+            "F[0].P1[0].NamedInsured_SICCode_A[0]": str(c["sic_code"]),
+            "F[0].P1[0].NamedInsured_NAICSCode_A[0]": naics,
+            "F[0].P1[0].NamedInsured_TaxIdentifier_A[0]": f"{c['tax_a']}-{c['tax_b']}",
+            "F[0].P1[0].NamedInsured_Primary_PhoneNumber_A[0]": phone("insured_phone"),
+            "F[0].P1[0].NamedInsured_Primary_WebsiteAddress_A[0]": mk_company_domain(company),
+            "F[0].P1[0].NamedInsured_LegalEntity_MemberManagerCount_A[0]": str(c["member_count"]),
+            "F[0].P1[0].NamedInsured_LegalEntity_OtherDescription_A[0]": "",
+
+            # Page 2
+            "F[0].P2[0].CommercialStructure_PhysicalAddress_LineOne_A[0]": street,
+            "F[0].P2[0].CommercialStructure_PhysicalAddress_LineTwo_A[0]": "",
+            "F[0].P2[0].CommercialStructure_PhysicalAddress_CityName_A[0]": city,
+            "F[0].P2[0].CommercialStructure_PhysicalAddress_CountyName_A[0]": pooled("county") + " County",
+            "F[0].P2[0].CommercialStructure_PhysicalAddress_StateOrProvinceCode_A[0]": state,
+            "F[0].P2[0].CommercialStructure_PhysicalAddress_PostalCode_A[0]": zipc,
+            "F[0].P2[0].CommercialStructure_RiskLocation_InsideCityLimitsIndicator_A[0]": True,
+            "F[0].P2[0].CommercialStructure_RiskLocation_OutsideCityLimitsIndicator_A[0]": False,
+            "F[0].P2[0].CommercialStructure_RiskLocation_OtherIndicator_A[0]": False,
+            "F[0].P2[0].CommercialStructure_RiskLocation_OtherDescription_A[0]": "",
+            "F[0].P2[0].CommercialStructure_InsuredInterest_OwnerIndicator_A[0]": c["owner"],
+            "F[0].P2[0].CommercialStructure_InsuredInterest_TenantIndicator_A[0]": c["tenant"],
+            "F[0].P2[0].CommercialStructure_InsuredInterest_OtherIndicator_A[0]": False,
+            "F[0].P2[0].CommercialStructure_InsuredInterest_OtherDescription_A[0]": "",
+            "F[0].P2[0].BusinessInformation_FullTimeEmployeeCount_A[0]": str(c["ft_employees"]),
+            "F[0].P2[0].BusinessInformation_PartTimeEmployeeCount_A[0]": str(c["pt_employees"]),
+            "F[0].P2[0].CommercialStructure_AnnualRevenueAmount_A[0]": money("revenue"),
+            "F[0].P2[0].BuildingOccupancy_OccupiedArea_A[0]": str(c["occupied_area"]),
+            "F[0].P2[0].BuildingOccupancy_OpenToPublicArea_A[0]": str(c["public_area"]),
+            "F[0].P2[0].Construction_BuildingArea_A[0]": str(c["building_area"]),
+            "F[0].P2[0].BuildingOccupancy_OperationsDescription_A[0]": f"{biz} – typical operations, no unusual hazards.",
+            "F[0].P2[0].NamedInsured_BusinessStartDate_A[0]": (eff - timedelta(days=c["start_days"])).strftime("%m/%d/%Y"),
+            "F[0].P2[0].CommercialPolicy_OperationsDescription_A[0]": f"{biz}: primary operations include {pick('operations')}. Safety program in place.",
+
+            # Page 3
+            "F[0].P3[0].CommercialPolicy_FormalSafetyProgram_SafetyManualIndicator_A[0]": c["safety_manual"],
+            "F[0].P3[0].CommercialPolicy_FormalSafetyProgram_SafetyPositionIndicator_B[0]": c["safety_position"],
+            "F[0].P3[0].CommercialPolicy_FormalSafetyProgram_MonthlyMeetingsIndicator_B[0]": c["safety_meetings"],
+            "F[0].P3[0].CommercialPolicy_FormalSafetyProgram_OSHAIndicator_B[0]": c["safety_osha"],
+            "F[0].P3[0].CommercialPolicy_FormalSafetyProgram_OtherIndicator_B[0]": False,
+            "F[0].P3[0].CommercialPolicy_FormalSafetyProgram_OtherDescription_B[0]": "",
+            "F[0].P3[0].CommercialPolicy_RemarkText_A[0]": "No unusual exposures reported. Prior carriers listed below.",
+
+            # Page 3 prior coverage (examples)
+            "F[0].P3[0].PriorCoverage_PolicyYear_A[0]": str(eff.year - 1),
+            "F[0].P3[0].PriorCoverage_GeneralLiability_InsurerFullName_A[0]": pooled("prior_gl_company"),
+            "F[0].P3[0].PriorCoverage_GeneralLiability_PolicyNumberIdentifier_A[0]": f"GL-{c['prior_gl_number']}",
+            "F[0].P3[0].PriorCoverage_GeneralLiability_TotalPremiumAmount_A[0]": money("prior_gl_premium"),
+            "F[0].P3[0].PriorCoverage_GeneralLiability_EffectiveDate_A[0]": prior_eff,
+            "F[0].P3[0].PriorCoverage_GeneralLiability_ExpirationDate_A[0]": prior_exp,
+            "F[0].P3[0].PriorCoverage_Property_InsurerFullName_A[0]": pooled("prior_prop_company"),
+            "F[0].P3[0].PriorCoverage_Property_PolicyNumberIdentifier_A[0]": f"PR-{c['prior_prop_number']}",
+            "F[0].P3[0].PriorCoverage_Property_TotalPremiumAmount_A[0]": money("prior_prop_premium"),
+            "F[0].P3[0].PriorCoverage_Property_EffectiveDate_A[0]": prior_eff,
+            "F[0].P3[0].PriorCoverage_Property_ExpirationDate_A[0]": prior_exp,
+
+            # Page 4 header & signatures
+            "F[0].P4[0].LossHistory_InformationYearCount_A[0]": "5",
+            "F[0].P4[0].LossHistory_TotalAmount_A[0]": "",
+            "F[0].P4[0].Producer_AuthorizedRepresentative_FullName_A[0]": pooled("auth_rep"),
+            "F[0].P4[0].Producer_StateLicenseIdentifier_A[0]": str(c["license_id"]),
+            "F[0].P4[0].Producer_NationalIdentifier_A[0]": str(c["national_id"]),
+            "F[0].P4[0].NamedInsured_Signature_A[0]": f"/s/ {pooled('signer')}",
+            "F[0].P4[0].NamedInsured_SignatureDate_A[0]": eff_s,
+            "F[0].P4[0].NamedInsured_Initials_A[0]": "".join(w[0] for w in company.split() if w).upper()[:3],
+        }
+        return data, ent, losses
+
+    def __iter__(self):
+        for i in range(self.start, self.start + self.count):
+            yield self.record(i)
+
+def generate_records(count: int, seed: int = 0, start: int = 0, pool_size: int = POOL_SIZE,
+                     as_of: date | None = None) -> RecordBatch:
+    return RecordBatch(seed, start, count, pool_size, as_of)
+
+@lru_cache(maxsize=2)
+def _block(seed: int, block: int, as_of: date | None) -> RecordBatch:
+    return RecordBatch(seed, block * BLOCK, BLOCK, as_of=as_of)
+
+def record_for(seed: int, index: int, as_of: date | None = None):
+    """build_mock()-compatible record for one index, computed a BLOCK at a time."""
+    return _block(seed, index // BLOCK, as_of).record(index)
@@ -0,0 +1,12 @@
+# parallel.py  (executor helpers shared by the generator and scan_render)
+from collections import deque
+
+def bounded_map(ex, fn, jobs, max_inflight: int):
+    """executor.map that keeps at most max_inflight tasks queued, so results never pile up."""
+    pending = deque()
+    for job in jobs:
+        pending.append(ex.submit(fn, job))
+        if len(pending) >= max_inflight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
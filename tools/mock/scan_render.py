@@ -0,0 +1,216 @@
+# scan_render.py  (rasterize filled forms into scan-like image-only PDFs / TIFFs)
+import argparse, io, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+import numpy as np
+
+from parallel import bounded_map
+
+# Named scan artifact settings.
+#   dpi          render resolution
+#   skew         max rotation in degrees (uniform in [-skew, skew]), applied in the render matrix
+#   noise        gaussian sensor noise, stddev in 0-255 grey levels
+#   blur         box blur radius in pixels (0 = off)
+#   jpeg_quality JPEG quality of each page image
+#   gray         render single channel (real scanners/fax mostly do)
+SCAN_PROFILES = {
+    "clean":  {"dpi": 200, "skew": 0.0, "noise": 0.0,  "blur": 0, "jpeg_quality": 90, "gray": True},
+    "office": {"dpi": 300, "skew": 1.0, "noise": 6.0,  "blur": 1, "jpeg_quality": 75, "gray": True},
+    "fax":    {"dpi": 200, "skew": 2.5, "noise": 14.0, "blur": 1, "jpeg_quality": 45, "gray": True},
+    "color":  {"dpi": 300, "skew": 0.8, "noise": 4.0,  "blur": 0, "jpeg_quality": 80, "gray": False},
+}
+SCAN_FORMATS = ("pdf", "tiff")
+
+# Noise and blur run over strips of this many rows. Peak extra memory per page is
+# three float32 strip buffers plus, with blur, a uint8 copy of the page (about
+# 25 MB for a 300 dpi color letter page) instead of three full-page float32 copies.
+STRIP_ROWS = 256
+
+# Per-process float32 scratch buffers, keyed by name and grown to the largest
+# strip seen, so after the first page nothing is allocated for noise or blur.
+_SCRATCH = {}
+
+def _scratch(name: str, shape):
+    n = int(np.prod(shape))
+    buf = _SCRATCH.get(name)
+    if buf is None or buf.size < n:
+        buf = _SCRATCH[name] = np.empty(n, dtype=np.float32)
+    return buf[:n].reshape(shape)
+
+def _box_blur(a, r: int, tmp):
+    """In-place separable box blur of float32 `a` (H x W x C) using cumulative sums in `tmp`."""
+    k = 2 * r + 1
+    for axis in (0, 1):
+        src = np.moveaxis(a, axis, 0)
+        cs = np.moveaxis(tmp, axis, 0)
+        n = src.shape[0]
+        if n <= k:
+            continue
+        np.cumsum(src, axis=0, out=cs)
+        np.subtract(cs[k:], cs[:n - k], out=src[r + 1:n - r])
+        src[r + 1:n - r] /= k
+        # edges average over the part of the window inside the image
+        for j in range(r + 1):
+            np.divide(cs[j + r], j + r + 1, out=src[j])
+            np.divide(cs[n - 1] - cs[n - 2 - r - j], r + 1 + j, out=src[n - 1 - j])
+
+def _degrade(pix, profile: dict, rng):
+    """
+    Apply noise and blur to the pixmap samples in place, STRIP_ROWS rows at a
+    time. The result is the same as one full-page pass: each strip is blurred
+    with `blur` rows of context on either side, and noise is drawn strip after
+    strip in row order.
+    """
+    noise, blur = profile["noise"], profile["blur"]
+    if not noise and not blur:
+        return
+    h = pix.height
+    img = np.frombuffer(pix.samples_mv, dtype=np.uint8)
+    if pix.stride != pix.width * pix.n:
+        return  # padded rows; never produced by get_pixmap, but don't guess
+    img = img.reshape(h, pix.width, pix.n)
+    # strips are written back as they finish, so blur reads its context rows from the original
+    src = img.copy() if blur else img
+    for y0 in range(0, h, STRIP_ROWS):
+        y1 = min(h, y0 + STRIP_ROWS)
+        lo, hi = max(0, y0 - blur), min(h, y1 + blur)
+        if blur and hi - lo <= 2 * blur + 1:
+            lo = max(0, hi - 2 * blur - 2)   # _box_blur skips an axis this short; widen upwards
+        window = (hi - lo, pix.width, pix.n)
+        work = _scratch("work", window)
+        work[...] = src[lo:hi]
+        if blur:
+            _box_blur(work, blur, _scratch("tmp", window))
+        work = work[y0 - lo:y1 - lo]
+        if noise:
+            nbuf = _scratch("noise", work.shape)
+            rng.standard_normal(dtype=np.float32, out=nbuf)
+            nbuf *= noise
+            work += nbuf
+        np.clip(work, 0, 255, out=work)
+        np.rint(work, out=work)
+        img[y0:y1] = work
+
+def scan_pages(doc, profile: dict, rng):
+    """
+    Yield (width_pt, height_pt, jpeg_bytes, to_pixels, (width_px, height_px))
+    per page, where to_pixels maps page points to pixels of the (skewed)
+    image. One page
+    pixmap is alive at a time, whatever the document or batch size.
+    """
+    zoom = profile["dpi"] / 72
+    cs = fitz.csGRAY if profile["gray"] else fitz.csRGB
+    for page in doc:
+        angle = rng.uniform(-profile["skew"], profile["skew"]) if profile["skew"] else 0.0
+        mat = fitz.Matrix(zoom, zoom).prerotate(angle)
+        pix = page.get_pixmap(matrix=mat, colorspace=cs, alpha=False)
+        _degrade(pix, profile, rng)
+        data = pix.tobytes("jpeg", jpg_quality=profile["jpeg_quality"])
+        # the rotated page's bounding box starts at pixel (0, 0)
+        to_pixels = mat * fitz.Matrix(1, 0, 0, 1, -pix.x, -pix.y)
+        size = (pix.width, pix.height)
+        width, height = page.rect.width, page.rect.height
+        del pix
+        yield width, height, data, to_pixels, size
+
+def write_scan(doc, out_path: str, profile: dict, rng, fmt: str = "pdf"):
+    """
+    Render `doc` as a scan to out_path (.pdf image-only or multi-page .tif).
+    Returns (bytes written, per-page matrices from source page points to scan
+    page points). A TIFF page is its image at profile["dpi"]; an image-only PDF
+    page has the source page size with the skewed image fitted inside it.
+    """
+    transforms = []
+    if fmt == "tiff":
+        try:
+            from PIL import Image, TiffImagePlugin
+        except ImportError:
+            raise RuntimeError("TIFF scan output needs Pillow (pip install pillow)")
+        to_points = fitz.Matrix(72 / profile["dpi"], 72 / profile["dpi"])
+        # frames are appended as they are rendered, so only one page image is in memory
+        with TiffImagePlugin.AppendingTiffWriter(out_path, new=True) as tf:
+            for _, _, data, to_pixels, _ in scan_pages(doc, profile, rng):
+                with Image.open(io.BytesIO(data)) as im:
+                    im.save(tf, format="TIFF", compression="jpeg", quality=profile["jpeg_quality"],
+                            dpi=(profile["dpi"],) * 2)
+                tf.newFrame()
+                transforms.append(to_pixels * to_points)
+    else:
+        with fitz.open() as out:
+            for width, height, data, to_pixels, (pw, ph) in scan_pages(doc, profile, rng):
+                page = out.new_page(width=width, height=height)
+                xref = page.insert_image(page.rect, stream=data)
+                r = page.get_image_rects(xref)[0]   # the image is fitted and centered in the page
+                transforms.append(to_pixels * fitz.Matrix(r.width / pw, 0, 0, r.height / ph, r.x0, r.y0))
+            out.save(out_path, garbage=1, no_new_id=True)
+    return os.path.getsize(out_path), transforms
+
+def scan_boxes(record: dict, transforms: list):
+    """
+    Add "scan_bbox" to every labeled field of a ground-truth record: its bbox
+    carried through the scan's skew and scaling (the bounding box of the
+    rotated rectangle), in points of the scan page.
+    """
+    for f in record["fields"]:
+        if f.get("bbox") is None:
+            continue
+        r = (fitz.Rect(f["bbox"]).quad * transforms[f["page"] - 1]).rect
+        f["scan_bbox"] = [round(v, 2) for v in (r.x0, r.y0, r.x1, r.y1)]
+    return record
+
+def scan_path(pdf_path: str, fmt: str) -> str:
+    stem = os.path.splitext(pdf_path)[0]
+    return f"{stem}.scan.tif" if fmt == "tiff" else f"{stem}.scan.pdf"
+
+def render_scan(doc, pdf_path: str, profile_name: str, fmt: str = "pdf", seed=0):
+    """
+    Scan `doc` next to pdf_path with artifacts drawn from `seed`.
+    Returns (scan_path, bytes, transforms); see write_scan and scan_boxes.
+    """
+    if profile_name not in SCAN_PROFILES:
+        raise ValueError(f"unknown scan profile {profile_name!r}; choose from {', '.join(sorted(SCAN_PROFILES))}")
+    out_path = scan_path(pdf_path, fmt)
+    size, transforms = write_scan(doc, out_path, SCAN_PROFILES[profile_name], np.random.default_rng(seed), fmt)
+    return out_path, size, transforms
+
+def _render_job(job):
+    src, profile_name, fmt, seed = job
+    t0 = time.perf_counter()
+    with fitz.open(src) as doc:
+        out_path, size, _ = render_scan(doc, src, profile_name, fmt, seed)
+    return out_path, size, time.perf_counter() - t0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render existing PDFs as scanned documents.")
+    ap.add_argument("pdfs", nargs="+", help="input PDFs (e.g. out/ACORD_125_Sample_*.pdf)")
+    ap.add_argument("--profile", choices=sorted(SCAN_PROFILES), default="office")
+    ap.add_argument("--format", choices=SCAN_FORMATS, default="pdf")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=0, help="artifact seed; file i uses (seed, i)")
+    args = ap.parse_args(argv)
+
+    pdfs = [p for p in args.pdfs if not p.endswith((".scan.pdf", ".scan.tif"))]
+    jobs = [(src, args.profile, args.format, (args.seed, i))
+            for i, src in enumerate(pdfs)]
+    total = 0
+    t0 = time.perf_counter()
+    if args.workers <= 1:
+        results = map(_render_job, jobs)
+    else:
+        ex = ProcessPoolExecutor(max_workers=args.workers)
+        results = bounded_map(ex, _render_job, jobs, max_inflight=args.workers * 2)
+    try:
+        for out_path, size, secs in results:
+            total += size
+            print(f"Wrote: {out_path} ({size/1024:.0f} KiB, {secs*1000:.0f} ms)")
+    finally:
+        if args.workers > 1:
+            ex.shutdown()
+    elapsed = time.perf_counter() - t0
+    if jobs:
+        print(f"{len(jobs)} scans, {total/1e6:.1f} MB, {len(jobs)/elapsed:.2f} docs/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
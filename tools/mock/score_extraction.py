@@ -0,0 +1,347 @@
+# score_extraction.py  (ground truth JSONL vs. extraction JSONL -> per-field accuracy, calibration, checkbox confusion)
+import argparse, json, os, re, sys, time, zlib
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+import numpy as np
+
+WTYPE_CHECKBOX = 2
+
+# Value kinds, decided from the ground-truth value (the generator's formats)
+TEXT, MONEY, DATE, PHONE, CHECKBOX = range(5)
+KIND_NAMES = ["text", "money", "date", "phone", "checkbox"]
+MONEY_RE = re.compile(r"^\$[\d,]+(\.\d\d)?$")                 # money(): "$12,345"
+DATE_RE = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")         # "%m/%d/%Y"
+ISO_DATE_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})")      # DI Date fields come back as yyyy-MM-dd
+PHONE_RE = re.compile(r"^\(\d{3}\) \d{3}-\d{4}$")              # fmt_phone(): "(555) 555-5555"
+PATH_SEP = re.compile(r"[\\/]+")
+NON_DIGIT = re.compile(r"\D")
+SPACES = re.compile(r"\s+")
+CHECKED = {"1", "true", "yes", "on", "x", "selected", ":selected:", "checked"}
+
+# Extraction documents are matched to ground truth by file basename under one of these keys
+DOC_KEYS = ("file", "fileName", "document")
+DOC_KEY_RES = [re.compile(r'"%s"\s*:\s*"((?:[^"\\]|\\.)*)"' % k) for k in DOC_KEYS]
+
+# Per-field stat columns
+TOTAL, PRESENT, EXACT, FUZZY, CB_TP, CB_FP, CB_FN, CB_TN = range(8)
+NSTAT = 8
+# Per-(field, confidence bin) calibration columns
+CAL_N, CAL_CONF, CAL_OK = range(3)
+
+def kind_of(field: dict) -> int:
+    """Kind of one ground-truth value; blank values are TEXT."""
+    if field.get("checked") is not None or field.get("field_type") == WTYPE_CHECKBOX:
+        return CHECKBOX
+    v = str(field.get("value") or "")
+    if MONEY_RE.match(v):
+        return MONEY
+    if DATE_RE.match(v):
+        return DATE
+    if PHONE_RE.match(v):
+        return PHONE
+    return TEXT
+
+def normalize(value, kind: int) -> str:
+    """Canonical string for comparison; truth and prediction go through the same kind."""
+    if kind == CHECKBOX:
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        return "1" if str(value or "").strip().lower() in CHECKED else "0"
+    s = SPACES.sub(" ", str(value if value is not None else "")).strip()
+    if kind == MONEY:
+        s = s.replace("$", "").replace(",", "").replace(" ", "")
+        return s[:-3] if s.endswith(".00") else s
+    if kind == DATE:
+        m = DATE_RE.match(s)
+        if m:
+            return f"{m.group(3)}-{int(m.group(1)):02d}-{int(m.group(2)):02d}"
+        m = ISO_DATE_RE.match(s)
+        if m:
+            return f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}"
+        return s
+    if kind == PHONE:
+        digits = NON_DIGIT.sub("", s)
+        return digits[-10:] if len(digits) >= 10 else digits
+    return s.casefold()
+
+@lru_cache(maxsize=1 << 16)
+def similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b).ratio()
+
+def _doc_key(line: str):
+    """
+    Basename used to shard and to join the two files, read from the raw line
+    (the string decoded as json would) so the bucketing pass in score() never
+    parses whole lines. Only a line with no string doc key is parsed. Keys are
+    computed once, before sharding, so they never depend on the shard count.
+    """
+    for rx in DOC_KEY_RES:
+        m = rx.search(line)
+        if m and m.group(1):
+            return PATH_SEP.split(json.loads(f'"{m.group(1)}"'))[-1]
+    rec = json.loads(line)
+    for k in DOC_KEYS:
+        if rec.get(k):
+            return PATH_SEP.split(str(rec[k]))[-1]
+    return None
+
+def _shard_of(key, shards: int):
+    """Shard that scores a document; None (skipped) for a line without a doc key when sharding."""
+    if shards == 1:
+        return 0
+    return None if key is None else zlib.crc32(key.encode()) % shards
+
+def _latest_lines(path: str, shards: int = 1) -> list:
+    """
+    One pass over a JSONL file: per shard, { key -> (byte offset, length) }
+    of the last line for each document. The generator appends to its
+    manifest, so a rerun document has several lines and the newest one wins.
+    Workers get only their slice and read just those lines.
+    """
+    out = [{} for _ in range(shards)]
+    offset = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            line = raw.decode("utf-8")
+            if line.strip():
+                key = _doc_key(line)
+                shard = _shard_of(key, shards)
+                if shard is not None:
+                    out[shard][key] = (offset, len(raw))
+            offset += len(raw)
+    return out
+
+def _read_lines(path: str, lines: dict):
+    """Yield (key, parsed record) for the { key -> (offset, length) } lines of path."""
+    with open(path, "rb") as f:
+        for key, (offset, length) in lines.items():
+            f.seek(offset)
+            yield key, json.loads(f.read(length))
+
+def _prediction(entry):
+    """(value, confidence) from the shapes AnalyzeAcord125Async results get serialized in."""
+    if isinstance(entry, dict):
+        for vk, ck in (("value", "confidence"), ("Value", "Confidence"), ("Item1", "Item2")):
+            if vk in entry:
+                return entry[vk], entry.get(ck)
+        return None, None
+    if isinstance(entry, (list, tuple)):
+        return (entry[0], entry[1]) if len(entry) > 1 else (entry[0] if entry else None, None)
+    return entry, None
+
+def _read_extractions(path: str, lines: dict):
+    out = {}
+    for key, rec in _read_lines(path, lines):
+        fields = rec.get("fields", rec.get("Fields", {}))
+        out[key] = {name: _prediction(v) for name, v in fields.items()}
+    return out
+
+def score_shard(job):
+    """
+    Score one shard: the truth and extraction lines the parent bucketed to it
+    ({ key -> (offset, length) } each, see _latest_lines). Returns count arrays
+    that add up across shards: per-field stats, per-field calibration bins,
+    and the field names / kinds indexing them.
+    """
+    truth_path, truth_lines, extract_path, extract_lines, fuzzy, bins = job
+    preds = _read_extractions(extract_path, extract_lines)
+
+    names, kinds, ids = [], [], {}
+    col_field, col_exact, col_fuzzy, col_present, col_conf, col_truth_cb, col_pred_cb = ([] for _ in range(7))
+    docs = docs_without_extraction = 0
+    seen = set()
+    for key, rec in _read_lines(truth_path, truth_lines):
+        docs += 1
+        doc_preds = preds.get(key)
+        if doc_preds is None:
+            docs_without_extraction += 1
+            doc_preds = {}
+        seen.add(key)
+        for fld in rec["fields"]:
+            name = fld["field_name"]
+            kind = kind_of(fld)
+            fid = ids.get(name)
+            if fid is None:
+                fid = ids[name] = len(names)
+                names.append(name)
+                kinds.append(kind)
+            elif kinds[fid] == TEXT:
+                # blank values look like text; the field takes the first specific kind seen
+                kinds[fid] = kind
+            truth = normalize(fld["checked"] if kind == CHECKBOX and fld.get("checked") is not None
+                              else fld.get("value"), kind)
+            pv, conf = doc_preds.get(name, (None, None))
+            # the API drops blank values, so an absent prediction means "empty" / "unchecked"
+            pred = normalize(pv, kind)
+            exact = pred == truth
+            col_field.append(fid)
+            col_exact.append(exact)
+            col_fuzzy.append(exact or (kind == TEXT and similarity(pred, truth) >= fuzzy))
+            col_present.append(pv is not None)
+            col_conf.append(-1.0 if conf is None else float(conf))
+            col_truth_cb.append(truth == "1")
+            col_pred_cb.append(pred == "1")
+
+    n = len(names)
+    field = np.asarray(col_field, dtype=np.int64)
+    exact = np.asarray(col_exact, dtype=bool)
+    fuzzy_ok = np.asarray(col_fuzzy, dtype=bool)
+    present = np.asarray(col_present, dtype=bool)
+    conf = np.asarray(col_conf, dtype=np.float64)
+    is_cb = np.asarray(kinds, dtype=np.int64)[field] == CHECKBOX if n else np.zeros(0, bool)
+    t_cb = np.asarray(col_truth_cb, dtype=bool)
+    p_cb = np.asarray(col_pred_cb, dtype=bool)
+
+    stats = np.zeros((n, NSTAT), dtype=np.int64)
+    stats[:, TOTAL] = np.bincount(field, minlength=n)
+    stats[:, PRESENT] = np.bincount(field, weights=present, minlength=n)
+    stats[:, EXACT] = np.bincount(field, weights=exact, minlength=n)
+    stats[:, FUZZY] = np.bincount(field, weights=fuzzy_ok, minlength=n)
+    # checkbox confusion: cell = field*4 + truth*2 + pred -> (tn, fp, fn, tp)
+    cell = np.bincount(field[is_cb] * 4 + t_cb[is_cb] * 2 + p_cb[is_cb], minlength=n * 4).reshape(n, 4)
+    stats[:, CB_TN], stats[:, CB_FP], stats[:, CB_FN], stats[:, CB_TP] = cell.T
+
+    # calibration over predictions that carry a confidence
+    has_conf = conf >= 0
+    b = np.minimum((conf[has_conf] * bins).astype(np.int64), bins - 1)
+    fb = field[has_conf] * bins + b
+    cal = np.zeros((n, bins, 3), dtype=np.float64)
+    cal[:, :, CAL_N] = np.bincount(fb, minlength=n * bins).reshape(n, bins)
+    cal[:, :, CAL_CONF] = np.bincount(fb, weights=conf[has_conf], minlength=n * bins).reshape(n, bins)
+    cal[:, :, CAL_OK] = np.bincount(fb, weights=exact[has_conf], minlength=n * bins).reshape(n, bins)
+
+    return {"names": names, "kinds": kinds, "stats": stats, "cal": cal, "docs": docs,
+            "docs_without_extraction": docs_without_extraction,
+            "extractions_without_truth": len(set(preds) - seen)}
+
+def merge_shards(parts, bins: int):
+    """Sum shard arrays by field name."""
+    names, kinds, ids = [], [], {}
+    for p in parts:
+        for name, kind in zip(p["names"], p["kinds"]):
+            if name not in ids:
+                ids[name] = len(names)
+                names.append(name)
+                kinds.append(kind)
+            elif kinds[ids[name]] == TEXT:
+                kinds[ids[name]] = kind
+    stats = np.zeros((len(names), NSTAT), dtype=np.int64)
+    cal = np.zeros((len(names), bins, 3), dtype=np.float64)
+    totals = {"docs": 0, "docs_without_extraction": 0, "extractions_without_truth": 0}
+    for p in parts:
+        idx = np.asarray([ids[nm] for nm in p["names"]], dtype=np.int64)
+        np.add.at(stats, idx, p["stats"])
+        np.add.at(cal, idx, p["cal"])
+        for k in totals:
+            totals[k] += p[k]
+    return names, np.asarray(kinds, dtype=np.int64), stats, cal, totals
+
+def _ece(cal):
+    """Expected calibration error from (bins, 3) counts."""
+    n = cal[:, CAL_N]
+    total = n.sum()
+    if not total:
+        return None
+    nz = n > 0
+    gap = np.abs(cal[nz, CAL_OK] / n[nz] - cal[nz, CAL_CONF] / n[nz])
+    return float((n[nz] / total * gap).sum())
+
+def _ratio(a, b):
+    return round(float(a) / float(b), 4) if b else None
+
+def report(names, kinds, stats, cal, totals, bins: int):
+    rows = []
+    for i, name in enumerate(names):
+        s = stats[i]
+        row = {
+            "field_name": name,
+            "kind": KIND_NAMES[kinds[i]],
+            "count": int(s[TOTAL]),
+            "extracted": _ratio(s[PRESENT], s[TOTAL]),
+            "exact": _ratio(s[EXACT], s[TOTAL]),
+            "fuzzy": _ratio(s[FUZZY], s[TOTAL]),
+            "ece": None if _ece(cal[i]) is None else round(_ece(cal[i]), 4),
+        }
+        if kinds[i] == CHECKBOX:
+            tp, fp, fn, tn = (int(s[c]) for c in (CB_TP, CB_FP, CB_FN, CB_TN))
+            row["confusion"] = {"tp": tp, "fp": fp, "fn": fn, "tn": tn,
+                                "precision": _ratio(tp, tp + fp), "recall": _ratio(tp, tp + fn)}
+        rows.append(row)
+
+    overall_cal = cal.sum(axis=0) if len(names) else np.zeros((bins, 3))
+    edges = np.linspace(0, 1, bins + 1)
+    calibration = [{"bin": f"{edges[b]:.2f}-{edges[b+1]:.2f}", "count": int(overall_cal[b, CAL_N]),
+                    "mean_confidence": _ratio(overall_cal[b, CAL_CONF], overall_cal[b, CAL_N]),
+                    "accuracy": _ratio(overall_cal[b, CAL_OK], overall_cal[b, CAL_N])}
+                   for b in range(bins)]
+    by_kind = {}
+    for k, kname in enumerate(KIND_NAMES):
+        sel = kinds == k
+        if sel.any():
+            s = stats[sel].sum(axis=0)
+            by_kind[kname] = {"count": int(s[TOTAL]), "exact": _ratio(s[EXACT], s[TOTAL]),
+                              "fuzzy": _ratio(s[FUZZY], s[TOTAL])}
+    s = stats.sum(axis=0)
+    cb = stats[kinds == CHECKBOX].sum(axis=0) if len(names) else np.zeros(NSTAT)
+    return {
+        **totals,
+        "fields_scored": int(s[TOTAL]),
+        "exact": _ratio(s[EXACT], s[TOTAL]),
+        "fuzzy": _ratio(s[FUZZY], s[TOTAL]),
+        "extracted": _ratio(s[PRESENT], s[TOTAL]),
+        "ece": None if _ece(overall_cal) is None else round(_ece(overall_cal), 4),
+        "checkbox_confusion": {"tp": int(cb[CB_TP]), "fp": int(cb[CB_FP]), "fn": int(cb[CB_FN]), "tn": int(cb[CB_TN])},
+        "by_kind": by_kind,
+        "calibration": calibration,
+        "fields": sorted(rows, key=lambda r: (r["exact"] if r["exact"] is not None else 1, r["field_name"])),
+    }
+
+def score(truth_path: str, extract_path: str, workers: int = 1, fuzzy: float = 0.9, bins: int = 10):
+    """
+    Score a corpus; hash-sharded by document across `workers` processes, merged
+    at the end. Both files are scanned for doc keys once, here; each worker
+    then reads and parses only its own lines.
+    """
+    shards = max(1, workers)
+    truth, extract = _latest_lines(truth_path, shards), _latest_lines(extract_path, shards)
+    jobs = [(truth_path, truth[i], extract_path, extract[i], fuzzy, bins) for i in range(shards)]
+    if shards == 1:
+        parts = [score_shard(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=shards) as ex:
+            parts = list(ex.map(score_shard, jobs))
+    return report(*merge_shards(parts, bins), bins)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Score parser extractions against generator ground truth.")
+    ap.add_argument("truth", help="ground_truth.jsonl written by fill_acord125_fitz.py (last line per document wins)")
+    ap.add_argument("extractions", help='JSONL, one document per line: {"file": ..., "fields": {name: {"value", "confidence"}}}')
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--fuzzy", type=float, default=0.9, help="similarity ratio counted as a fuzzy match on text fields")
+    ap.add_argument("--bins", type=int, default=10, help="confidence bins for calibration")
+    ap.add_argument("--worst", type=int, default=15, help="print this many lowest-accuracy fields")
+    ap.add_argument("--out", default=None, help="write the full report JSON here")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    rep = score(args.truth, args.extractions, args.workers, args.fuzzy, args.bins)
+    elapsed = time.perf_counter() - t0
+    print(f"{rep['docs']} documents, {rep['fields_scored']} fields scored in {elapsed:.2f} s "
+          f"({rep['docs_without_extraction']} without extraction, {rep['extractions_without_truth']} unmatched extractions)")
+    print(f"  exact {rep['exact']}  fuzzy {rep['fuzzy']}  extracted {rep['extracted']}  ECE {rep['ece']}")
+    for kname, k in rep["by_kind"].items():
+        print(f"  {kname:<9} n={k['count']:<8} exact {k['exact']}  fuzzy {k['fuzzy']}")
+    print(f"  checkbox confusion: {rep['checkbox_confusion']}")
+    for r in rep["fields"][:args.worst]:
+        print(f"    {r['field_name']:<48} {r['kind']:<8} exact {r['exact']}  fuzzy {r['fuzzy']}  n={r['count']}")
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rep, f, indent=2)
+        print(f"Wrote: {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
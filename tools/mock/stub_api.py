@@ -0,0 +1,160 @@
+# stub_api.py  (local stand-in for the AcordParser upload/processing endpoints, for offline load tests)
+import argparse, json, random, re, threading, time, uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# DocumentStatus enum in AcordParser.Core (serialized as numbers by the API)
+UPLOADED, PROCESSING, COMPLETED, FAILED = 0, 1, 2, 3
+MAX_FILE_SIZE = 10 * 1024 * 1024
+TOKEN = "stub-token"
+
+DOC_PATH = re.compile(r"^/api/documents/([0-9a-f-]{36})$")
+
+def _iso(ts: float | None):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z") if ts else None
+
+def _multipart_file(body: bytes, content_type: str):
+    """(filename, data) of the first file part in a multipart/form-data body, or None."""
+    m = re.search(r'boundary="?([^";]+)"?', content_type or "")
+    if not m:
+        return None
+    delim = b"--" + m.group(1).encode()
+    for part in body.split(delim)[1:]:
+        head, sep, data = part.partition(b"\r\n\r\n")
+        if not sep:
+            continue
+        fn = re.search(rb'filename="([^"]*)"', head)
+        if fn:
+            return fn.group(1).decode("utf-8", "replace"), data[:-2] if data.endswith(b"\r\n") else data
+    return None
+
+class StubState:
+    """Uploaded documents and their simulated processing schedule."""
+    def __init__(self, processing_ms: float = 1500, jitter: float = 0.3, fail_rate: float = 0.0, seed: int = 0):
+        self.processing_ms = processing_ms
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.docs = {}
+        self.lock = threading.Lock()
+
+    def add(self, file_name: str, size: int):
+        now = time.time()
+        with self.lock:
+            delay = max(0.0, self.rng.gauss(self.processing_ms, self.processing_ms * self.jitter)) / 1000
+            failed = self.rng.random() < self.fail_rate
+            doc_id = str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+            # processing starts after a short queue wait, like the background worker picking it up
+            self.docs[doc_id] = {"fileName": file_name, "size": size, "uploaded": now,
+                                 "started": now + delay * 0.1, "done": now + delay, "failed": failed}
+        return doc_id
+
+    def detail(self, doc_id: str):
+        with self.lock:
+            d = self.docs.get(doc_id)
+        if d is None:
+            return None
+        now = time.time()
+        if now >= d["done"]:
+            status = FAILED if d["failed"] else COMPLETED
+        else:
+            status = PROCESSING if now >= d["started"] else UPLOADED
+        finished = status in (COMPLETED, FAILED)
+        return {
+            "id": doc_id,
+            "fileName": d["fileName"],
+            "fileUrl": None,
+            "status": status,
+            "uploadedAt": _iso(d["uploaded"]),
+            "processedAt": _iso(d["done"]) if finished else None,
+            "processingError": "Simulated analysis failure" if status == FAILED else None,
+            "extractedFields": [],
+        }
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so client connection pooling is exercised
+    state: StubState = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code: int, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _authorized(self):
+        if self.headers.get("Authorization") == f"Bearer {TOKEN}":
+            return True
+        self._send(401)
+        return False
+
+    def do_POST(self):
+        body = self._body()
+        if self.path == "/api/auth/login":
+            try:
+                email = json.loads(body or b"{}").get("email") or "loadtest@example.com"
+            except ValueError:
+                return self._send(400, {"error": "Invalid JSON"})
+            return self._send(200, {"token": TOKEN, "email": email, "subscriptionTier": 0,
+                                    "twoFactorRequired": False, "refreshToken": None})
+        if self.path == "/api/documents/upload":
+            if not self._authorized():
+                return
+            part = _multipart_file(body, self.headers.get("Content-Type"))
+            if part is None:
+                return self._send(400, {"error": "No file provided"})
+            name, data = part
+            if not data:
+                return self._send(400, {"error": "File is empty"})
+            if len(data) > MAX_FILE_SIZE:
+                return self._send(400, {"error": f"File size exceeds maximum allowed size of {MAX_FILE_SIZE // 1024 // 1024}MB"})
+            if not name.lower().endswith(".pdf") or not data.startswith(b"%PDF"):
+                return self._send(400, {"error": "File type not allowed. Allowed types: .pdf"})
+            doc_id = self.state.add(name, len(data))
+            return self._send(200, {"documentId": doc_id, "fileName": name, "status": UPLOADED})
+        self._send(404)
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send(200, {"status": "Healthy"})
+        m = DOC_PATH.match(self.path)
+        if not m:
+            return self._send(404)
+        if not self._authorized():
+            return
+        detail = self.state.detail(m.group(1))
+        self._send(200, detail) if detail else self._send(404)
+
+def serve(host: str = "127.0.0.1", port: int = 0, **state_opts):
+    """Start the stub in a daemon thread; returns (server, base_url). server.shutdown() stops it."""
+    handler = type("Handler", (StubHandler,), {"state": StubState(**state_opts)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stand-in for the document upload API (login, upload, status).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5080)
+    ap.add_argument("--processing-ms", type=float, default=1500, help="mean simulated analysis time")
+    ap.add_argument("--jitter", type=float, default=0.3, help="stddev of analysis time as a fraction of the mean")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="fraction of documents that end as Failed")
+    args = ap.parse_args(argv)
+    server, url = serve(args.host, args.port, processing_ms=args.processing_ms,
+                        jitter=args.jitter, fail_rate=args.fail_rate)
+    print(f"Stub API listening on {url} (token {TOKEN!r}); Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
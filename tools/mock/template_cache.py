@@ -0,0 +1,103 @@
+# template_cache.py  (load each ACORD template once, clone per sample)
+import fitz  # PyMuPDF
+import hashlib, os
+
+def scan_widgets(doc):
+    """
+    One pass over every page; returns plain widget metadata
+    [{ page, xref, field_name, field_type, rect }, ...]  (page is 0-based).
+    """
+    widgets = []
+    for pno in range(len(doc)):
+        for w in (doc[pno].widgets() or []):
+            widgets.append({
+                "page": pno,
+                "xref": w.xref,
+                "field_name": (w.field_name or "").strip(),
+                "field_type": w.field_type,
+                "rect": list(map(float, w.rect)) if getattr(w, "rect", None) else [0,0,0,0],
+            })
+    return widgets
+
+def field_index(widgets):
+    """{ field_name -> [(page_no, xref, field_type), ...] } from scan_widgets() output."""
+    index = {}
+    for w in widgets:
+        if w["field_name"]:
+            index.setdefault(w["field_name"], []).append((w["page"], w["xref"], w["field_type"]))
+    return index
+
+class Template:
+    """
+    A validated form template held in memory: raw bytes, content hash and
+    the widget metadata parsed once at load time. Xrefs are stable between
+    clones of the same bytes, so the index can be reused for every sample.
+    """
+    def __init__(self, path: str, data: bytes, digest: str, widgets: list | None = None):
+        self.path = path
+        self.data = data
+        self.digest = digest
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            if not doc.is_pdf or doc.needs_pass:
+                raise ValueError(f"{path}: not an unencrypted PDF")
+            if not doc.is_form_pdf:
+                raise ValueError(f"{path}: PDF has no AcroForm fields")
+            self.page_count = len(doc)
+            self.page_sizes = [(page.rect.width, page.rect.height) for page in doc]
+            # widgets from the inspect_fields catalog skip the per-page scan
+            self.widgets = widgets if widgets is not None else scan_widgets(doc)
+        if not self.widgets:
+            raise ValueError(f"{path}: AcroForm has no widgets")
+        self.index = field_index(self.widgets)
+        self.by_xref = {w["xref"]: w for w in self.widgets}
+
+    def open(self):
+        """Fresh working document parsed from the in-memory bytes (no disk I/O)."""
+        return fitz.open(stream=self.data, filetype="pdf")
+
+    def __repr__(self):
+        return f"Template({self.path!r}, sha256={self.digest[:12]}, fields={len(self.index)})"
+
+class TemplateCache:
+    """
+    Templates keyed by content hash. Paths are remembered by (mtime, size) so
+    repeat lookups skip the read; a changed file is re-read and re-hashed, and
+    two paths with identical bytes share one Template.
+    """
+    def __init__(self):
+        self._by_hash = {}
+        self._by_path = {}
+
+    def load(self, path: str, catalog: str | None = None) -> Template:
+        """catalog: optional inspect_fields SQLite catalog to take widget metadata from."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        hit = self._by_path.get(path)
+        if hit and hit[0] == stamp:
+            return self._by_hash[hit[1]]
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        tpl = self._by_hash.get(digest)
+        if tpl is None:
+            widgets = None
+            if catalog:
+                from inspect_fields import catalog_widgets
+                widgets = catalog_widgets(catalog, digest)
+            tpl = self._by_hash[digest] = Template(path, data, digest, widgets)
+        self._by_path[path] = (stamp, digest)
+        return tpl
+
+    def get(self, digest: str) -> Template | None:
+        return self._by_hash.get(digest)
+
+    def __len__(self):
+        return len(self._by_hash)
+
+# Process-wide cache used by the generator
+TEMPLATES = TemplateCache()
+
+def load_template(path: str, catalog: str | None = None) -> Template:
+    return TEMPLATES.load(path, catalog)